@@ -96,7 +96,7 @@ class TikTokSpider:
         elif mode == "3":
             self.data_analysis()
         elif mode == "4":
-            example = vis()
+            example = vis(self.PROJECT_ROOT)
             example.run()
 
     def check_settings(self):
@@ -0,0 +1,62 @@
+"""异常账号检测"""
+
+import numpy as np
+
+from src.customizer import ANOMALY_EPS, ANOMALY_MIN_SAMPLES
+
+__all__ = [
+    "GridDensity",
+]
+
+
+class GridDensity:
+    """
+    网格密度估计：数据取 log1p 后归一化并划分为边长 eps 的网格，
+    统计每个网格及其周围 3×3 网格内的数据量，少于 min_samples 的数据标记为异常；
+    与 DBSCAN 的核心点判断近似，时间与内存开销随数据量线性增长
+    """
+    NORMAL = 0
+    ANOMALY = -1  # 与 DBSCAN 噪声点标签一致
+
+    def __init__(self, eps=ANOMALY_EPS, min_samples=ANOMALY_MIN_SAMPLES):
+        self.eps = eps
+        self.min_samples = min_samples
+        self.bins = max(int(np.ceil(1 / eps)), 1)  # 每个维度的网格数量
+        self.density = None  # 每条数据的邻域数据量
+
+    def cells(self, values: np.ndarray) -> np.ndarray:
+        """返回每条数据所在网格的坐标"""
+        scaled = np.log1p(np.clip(values, 0, None))
+        low = scaled.min(axis=0)
+        span = scaled.max(axis=0) - low
+        span[span == 0] = 1
+        return np.minimum(
+            ((scaled - low) / span * self.bins).astype(np.int64), self.bins - 1)
+
+    def neighbour_counts(self, cells: np.ndarray) -> np.ndarray:
+        size = self.bins + 2  # 四周填充一圈空网格，便于平移求和
+        grid = np.bincount(
+            (cells[:, 0] + 1) * size + cells[:, 1] + 1,
+            minlength=size * size).reshape(size, size)
+        total = np.zeros((self.bins, self.bins), dtype=np.int64)
+        for dx in range(3):
+            for dy in range(3):
+                total += grid[dx:dx + self.bins, dy:dy + self.bins]
+        return total
+
+    def fit_predict(self, values) -> np.ndarray:
+        """
+        :param values: n×2 数组，缺失值或非数值数据不参与统计，标记为正常
+        :return: 标签数组，正常为 0，异常为 -1
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values).any(axis=1)
+        labels = np.full(len(values), self.NORMAL, dtype=np.int64)
+        self.density = np.zeros(len(values), dtype=np.int64)
+        if not valid.any():
+            return labels
+        cells = self.cells(values[valid])
+        density = self.neighbour_counts(cells)[cells[:, 0], cells[:, 1]]
+        self.density[valid] = density
+        labels[valid] = np.where(density >= self.min_samples, self.NORMAL, self.ANOMALY)
+        return labels
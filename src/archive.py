@@ -0,0 +1,190 @@
+"""原始响应归档与离线重新提取"""
+
+from gzip import compress
+from gzip import decompress
+from json import dumps
+from json import loads
+from pathlib import Path
+from sqlite3 import connect
+from time import time
+from urllib.parse import urlparse
+
+from src.customizer import ARCHIVE_SEGMENT_SIZE, EXTRACT_POOL_THRESHOLD
+
+__all__ = [
+    "RawArchive",
+    "Replayer",
+]
+
+
+class RawArchive:
+    """
+    将每页原始响应追加到分段的 NDJSON 文件中，每页数据压缩为一个独立的 gzip 成员，
+    分段文件可以直接使用 gzip 工具解压；索引记录每页数据所在的分段与偏移
+    """
+    folder = "Archive"
+    index_file = "index.db"
+    key_params = ("keyword", "aweme_id", "item_id")  # 作为索引关键字的请求参数
+    cursor_params = ("cursor", "offset")
+
+    def __init__(self, root: Path, segment_size=ARCHIVE_SEGMENT_SIZE):
+        self.root = root.joinpath(self.folder)
+        self.segment_size = segment_size
+        self.segment = None  # 当前分段文件
+        self.db = None  # 索引数据库
+
+    def open(self):
+        if self.db:
+            return
+        self.root.mkdir(exist_ok=True)
+        self.db = connect(self.root.joinpath(self.index_file))
+        self.db.execute("PRAGMA journal_mode=WAL;")
+        self.db.execute("PRAGMA synchronous=NORMAL;")
+        with self.db:
+            self.db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY,
+            endpoint TEXT,
+            key TEXT,
+            cursor TEXT,
+            time REAL,
+            segment TEXT,
+            offset INTEGER,
+            length INTEGER);""")
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pages_key ON pages (key, endpoint);")
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pages_time ON pages (time);")
+        self.segment = self.last_segment()
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+    def last_segment(self) -> Path:
+        segments = sorted(self.root.glob("segment_*.ndjson.gz"))
+        return segments[-1] if segments else self.segment_path(1)
+
+    def segment_path(self, number: int) -> Path:
+        return self.root.joinpath(f"segment_{number:06d}.ndjson.gz")
+
+    def next_segment(self) -> Path:
+        if self.segment.exists() and self.segment.stat().st_size >= self.segment_size:
+            self.segment = self.segment_path(int(self.segment.name[8:14]) + 1)
+        return self.segment
+
+    @staticmethod
+    def extract_param(params: dict, keys: tuple) -> str:
+        for i in keys:
+            if i in params:
+                return str(params[i])
+        return ""
+
+    def append(self, url: str, params: dict | None, data: dict):
+        """归档一页原始响应"""
+        self.open()
+        params = params or {}
+        now = time()
+        payload = compress(dumps(
+            {"url": url, "params": params, "time": now, "data": data},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("UTF-8") + b"\n")
+        segment = self.next_segment()
+        with segment.open("ab") as f:
+            offset = f.tell()
+            f.write(payload)
+        with self.db:
+            self.db.execute(
+                "INSERT INTO pages (endpoint, key, cursor, time, segment, offset, length) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?);",
+                (urlparse(url).path,
+                 self.extract_param(params, self.key_params),
+                 self.extract_param(params, self.cursor_params),
+                 now,
+                 segment.name,
+                 offset,
+                 len(payload)))
+
+    def search(
+            self,
+            endpoint: str = None,
+            key: str = None,
+            since: float = None,
+            until: float = None) -> list[tuple]:
+        """查询索引，返回 (id, endpoint, key, segment, offset, length)"""
+        self.open()
+        clauses, values = [], []
+        for column, operator, value in (
+                ("endpoint", "=", endpoint),
+                ("key", "=", key),
+                ("time", ">=", since),
+                ("time", "<", until),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                values.append(value)
+        where = f" WHERE {" AND ".join(clauses)}" if clauses else ""
+        return self.db.execute(
+            f"SELECT id, endpoint, key, segment, offset, length FROM pages{where} ORDER BY id;",
+            values).fetchall()
+
+    def read(self, segment: str, offset: int, length: int) -> dict:
+        with self.root.joinpath(segment).open("rb") as f:
+            f.seek(offset)
+            return loads(decompress(f.read(length)))
+
+    def pages(self, *args, **kwargs):
+        """按归档顺序读取原始响应，参数同 search"""
+        for _, _, _, segment, offset, length in self.search(*args, **kwargs):
+            yield self.read(segment, offset, length)
+
+
+class Replayer:
+    """将归档的原始响应重新交给提取器处理"""
+    # 接口路径: (响应数据键名, 提取类型, 提取参数)
+    rules = {
+        "/aweme/v1/web/general/search/single/": ("data", "search", {"tab": 0}),
+        "/aweme/v1/web/search/item/": ("data", "search", {"tab": 1}),
+        "/aweme/v1/web/discover/search/": ("user_list", "search", {"tab": 2}),
+        "/aweme/v1/web/comment/list/": ("comments", "comment", {}),
+        "/aweme/v1/web/comment/list/reply/": ("comments", "comment", {}),
+    }
+    data_type = {
+        0: "works",
+        1: "works",
+        2: "search_user",
+    }
+
+    def __init__(self, archive: RawArchive, extractor, pool=None):
+        self.archive = archive
+        self.extractor = extractor
+        self.pool = pool  # 数据量较大时使用多进程提取
+
+    def groups(self, key: str = None, since: float = None, until: float = None) -> dict:
+        """按照接口与关键字分组归档数据的索引"""
+        groups = {}
+        for row in self.archive.search(key=key, since=since, until=until):
+            if row[1] in self.rules:
+                groups.setdefault((row[1], row[2]), []).append(row)
+        return groups
+
+    def items(self, endpoint: str, rows: list[tuple]) -> list[dict]:
+        name = self.rules[endpoint][0]
+        items = []
+        for _, _, _, segment, offset, length in rows:
+            items.extend(self.archive.read(
+                segment, offset, length)["data"].get(name) or [])
+        return items
+
+    def type_(self, endpoint: str) -> str:
+        _, extract, kwargs = self.rules[endpoint]
+        return self.data_type[kwargs["tab"]] if extract == "search" else "comment"
+
+    def run(self, endpoint: str, rows: list[tuple], recorder):
+        """重新提取一组归档数据并写入记录器"""
+        _, extract, kwargs = self.rules[endpoint]
+        items = self.items(endpoint, rows)
+        extractor = self.pool if self.pool and len(
+            items) >= EXTRACT_POOL_THRESHOLD else self.extractor
+        return extractor.run(items, recorder, extract, **kwargs)
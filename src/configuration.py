@@ -7,7 +7,8 @@ from pathlib import Path
 from time import localtime, strftime
 from types import SimpleNamespace
 
-from src.customizer import INFO, ERROR
+from src.archive import RawArchive
+from src.customizer import INFO, ERROR, ARCHIVE_RAW
 from src.parameter import TtWid
 from src.parseck import Register
 from src.stringcleaner import Cleaner
@@ -95,7 +96,7 @@ class Parameter:
             cookie: dict | str,
             root: str,
             date_format: str,
-            storage_format: str,
+            storage_format: str | list,
             # chunk: int,
             max_retry: int,
             max_pages: int,
@@ -116,6 +117,7 @@ class Parameter:
         self.cookie_cache = None
         self.cookie = self.check_cookie(cookie)
         self.root = self.check_root(root)
+        self.archive = RawArchive(self.root) if ARCHIVE_RAW else None  # 原始响应归档
         self.date_format = self.check_date_format(date_format)
         self.storage_format = self.check_storage_format(storage_format)  # 采集数据持久化存储格式
         # self.chunk = self.check_chunk(chunk)
@@ -192,10 +194,15 @@ class Parameter:
         except ValueError:
             return "%Y-%m-%d %H.%M.%S"
 
-    def check_storage_format(self, storage_format: str) -> str:
-        if storage_format in {"xlsx", "csv", "sql"}:
-            return storage_format
-        return ""
+    def check_storage_format(self, storage_format: str | list) -> tuple:
+        """支持同时设置多种存储格式，例如 "xlsx,store" 或 ["xlsx", "store"]"""
+        if isinstance(storage_format, str):
+            storage_format = storage_format.split(",")
+        if not isinstance(storage_format, (list, tuple)):
+            return ()
+        return tuple(dict.fromkeys(
+            i.strip() for i in storage_format if isinstance(i, str) and i.strip() in {
+                "xlsx", "csv", "sql", "store"}))
 
     def check_default_mode(self, default_mode: int) -> str:
         if default_mode in range(3, 7):
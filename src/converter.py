@@ -0,0 +1,253 @@
+"""数据文件格式转换与合并"""
+
+from argparse import ArgumentParser
+from contextlib import ExitStack
+from csv import reader
+from gzip import open as gzip_open
+from multiprocessing import Manager
+from multiprocessing import Pool
+from os import cpu_count
+from pathlib import Path
+from queue import Empty
+from re import compile
+from sqlite3 import connect
+
+from openpyxl import load_workbook
+
+from src.archive import RawArchive
+from src.customizer import CONVERT_CHUNK, CONVERT_QUEUE_SIZE
+from src.customizer import INFO, WARNING, ERROR
+from src.datastore import DataStore
+from src.records import CommentRecord
+from src.records import SearchUserRecord
+from src.records import WorksRecord
+from src.recorder import RecordManager
+
+__all__ = [
+    "Converter",
+]
+
+
+def _read_file(path: str, queue, chunk: int) -> None:
+    """子进程流式读取一个数据文件，分块发送到队列，结束时必定发送 done 消息"""
+    try:
+        for type_, aweme_id, rows in Converter.read(Path(path), chunk):
+            queue.put(("data", path, (type_, aweme_id, rows)))
+    except Exception as error:
+        queue.put(("error", path, repr(error)))
+    finally:
+        queue.put(("done", path, None))
+
+
+class Converter:
+    """
+    流式读取数据文件夹中零散的 xlsx/csv/SQLite 数据文件，按作品ID、评论ID、SEC_UID 去重后，
+    写入目标储存格式或数据仓库；每个文件由独立的子进程读取，主进程负责去重与写入
+    """
+    prefix = "合并数据"  # 输出文件名称前缀，读取时跳过
+    formats = tuple(RecordManager.DataLogger)  # 支持的目标储存格式
+    suffixes = (".xlsx", ".csv", ".gz", ".db")
+    skip_files = {DataStore.file, RawArchive.index_file}
+    records = {
+        "works": WorksRecord,
+        "comment": CommentRecord,
+        "search_user": SearchUserRecord,
+    }
+    # 标题行包含该列名时识别为对应数据类型，按顺序匹配
+    marks = (
+        ("评论ID", "comment"),
+        ("作品ID", "works"),
+        ("粉丝数量", "search_user"),
+    )
+    keys = {
+        "works": "作品ID",
+        "comment": "评论ID",
+        "search_user": "SEC_UID",
+    }
+    comment_name = compile(r"作品(\d+)_评论数据")
+
+    def __init__(
+            self,
+            root: Path,
+            format_: str,
+            console,
+            out: Path = None,
+            workers: int = None,
+            chunk=CONVERT_CHUNK,
+            queue_size=CONVERT_QUEUE_SIZE):
+        if format_ not in self.formats:
+            raise ValueError(f"不支持的储存格式：{format_}")
+        self.root = root
+        self.format = format_
+        self.console = console
+        self.out = out or root
+        self.workers = workers or cpu_count() or 1
+        self.chunk = max(chunk, 1)
+        self.queue_size = max(queue_size, 1)
+        self.loggers = {}  # (数据类型, 作品ID): 已打开的记录器
+        self.seen = {i: set() for i in self.records}  # 已写入数据的去重键
+        self.count = {i: [0, 0] for i in self.records}  # 数据类型: [读取行数, 写入行数]
+
+    def sources(self) -> list[Path]:
+        return sorted(
+            i for i in self.root.iterdir()
+            if i.is_file()
+            and i.name.endswith(self.suffixes)
+            and i.name not in self.skip_files
+            and not i.name.startswith(self.prefix))
+
+    @classmethod
+    def detect(cls, header) -> str | None:
+        for mark, type_ in cls.marks:
+            if mark in header:
+                return type_
+
+    @classmethod
+    def arrange(cls, type_: str, header, rows, chunk: int):
+        """将数据行按记录器列顺序重新排列，缺失的列填充空字符串，按块返回"""
+        index = {j: i for i, j in enumerate(header)}
+        order = [index.get(i) for i in cls.records[type_].titles]
+        block = []
+        for row in rows:
+            block.append(tuple(
+                "" if i is None or i >= len(row) or row[i] is None else row[i]
+                for i in order))
+            if len(block) >= chunk:
+                yield block
+                block = []
+        if block:
+            yield block
+
+    @classmethod
+    def aweme_id(cls, name: str) -> str:
+        return m.group(1) if (m := cls.comment_name.search(name)) else ""
+
+    @classmethod
+    def read(cls, path: Path, chunk: int):
+        """逐块返回 (数据类型, 评论所属作品ID, 数据行)，无法识别的数据表直接跳过"""
+        for name, header, rows in cls.tables(path):
+            header = ["" if i is None else str(i).strip() for i in header]
+            if type_ := cls.detect(header):
+                aweme_id = cls.aweme_id(name) if type_ == "comment" else ""
+                for block in cls.arrange(type_, header, rows, chunk):
+                    yield type_, aweme_id, block
+
+    @classmethod
+    def tables(cls, path: Path):
+        """按文件类型返回 (名称, 标题行, 数据行迭代器)"""
+        if path.suffix == ".xlsx":
+            yield from cls.xlsx_tables(path)
+        elif path.suffix == ".db":
+            yield from cls.sql_tables(path)
+        else:
+            yield from cls.csv_tables(path)
+
+    @staticmethod
+    def xlsx_tables(path: Path):
+        book = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in book.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                if header := next(rows, None):
+                    yield path.name, header, rows
+        finally:
+            book.close()
+
+    @staticmethod
+    def csv_tables(path: Path):
+        # 记录器在 Windows 下写入 BOM，使用 UTF-8-SIG 兼容两种编码
+        if path.name.endswith(".csv.gz"):
+            file = gzip_open(path, "rt", encoding="UTF-8-SIG", newline="")
+        elif path.suffix == ".csv":
+            file = path.open(encoding="UTF-8-SIG", newline="")
+        else:
+            return
+        with file:
+            rows = reader(file)
+            if header := next(rows, None):
+                yield path.name, header, rows
+
+    @staticmethod
+    def sql_tables(path: Path):
+        db = connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            tables = [i[0] for i in db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table';")]
+            for name in tables:
+                if name.startswith(Converter.prefix):
+                    continue
+                cursor = db.execute(f'SELECT * FROM "{name.replace('"', '""')}";')
+                yield name, [i[0] for i in cursor.description], cursor
+        finally:
+            db.close()
+
+    def logger(self, stack: ExitStack, type_: str, aweme_id: str):
+        """按需打开目标记录器；文件格式的评论数据按作品分别保存，数据仓库共用一个记录器"""
+        if self.format == "store" or type_ != "comment":
+            aweme_id = ""
+        if not (logger := self.loggers.get((type_, aweme_id))):
+            name = f"{self.prefix}_作品{aweme_id}_评论数据" if aweme_id else f"{self.prefix}_{type_}"
+            logger = stack.enter_context(RecordManager.DataLogger[self.format](
+                self.out, name=name, **RecordManager.LoggerParams[type_]))
+            self.loggers[(type_, aweme_id)] = logger
+        return logger
+
+    def deduplicate(self, type_: str, rows: list[tuple]) -> list[tuple]:
+        index = self.records[type_].titles.index(self.keys[type_])
+        seen, result = self.seen[type_], []
+        for row in rows:
+            if (key := str(row[index])) and key not in seen:
+                seen.add(key)
+                result.append(row)
+        return result
+
+    def write(self, stack: ExitStack, type_: str, aweme_id: str, rows: list[tuple]):
+        self.count[type_][0] += len(rows)
+        if rows := self.deduplicate(type_, rows):
+            self.logger(stack, type_, aweme_id).save_many(rows, aweme_id=aweme_id)
+            self.count[type_][1] += len(rows)
+
+    def run(self) -> dict:
+        """转换全部数据文件，返回各数据类型的 [读取行数, 写入行数]"""
+        if not (sources := self.sources()):
+            self.console.print(f"{self.root} 没有可以转换的数据文件", style=WARNING)
+            return self.count
+        self.out.mkdir(parents=True, exist_ok=True)
+        with Manager() as manager, Pool(
+                min(self.workers, len(sources))) as pool, ExitStack() as stack:
+            queue = manager.Queue(self.queue_size)
+            tasks = [pool.apply_async(_read_file, (str(i), queue, self.chunk))
+                     for i in sources]
+            done = 0
+            while done < len(sources):
+                try:
+                    message, path, data = queue.get(timeout=1)
+                except Empty:
+                    if all(i.ready() for i in tasks) and queue.empty():
+                        # 子进程异常退出，未能发送 done 消息
+                        break
+                    continue
+                if message == "data":
+                    self.write(stack, *data)
+                elif message == "error":
+                    self.console.print(f"读取文件 {path} 失败：{data}", style=ERROR)
+                else:
+                    done += 1
+        for type_, (read, written) in self.count.items():
+            if read:
+                self.console.print(
+                    f"{type_} 数据读取 {read} 行，去重后写入 {written} 行", style=INFO)
+        return self.count
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+
+    parser = ArgumentParser(description="转换并合并数据文件夹中的采集数据")
+    parser.add_argument("source", type=Path, help="数据文件夹路径")
+    parser.add_argument("format", choices=Converter.formats, help="目标储存格式")
+    parser.add_argument("--out", type=Path, help="输出文件夹路径，默认为数据文件夹")
+    parser.add_argument("--workers", type=int, help="读取文件的子进程数量")
+    parser.add_argument("--chunk", type=int, default=CONVERT_CHUNK, help="每个数据块的行数")
+    args = parser.parse_args()
+    Converter(args.source, args.format, Console(), args.out, args.workers, args.chunk).run()
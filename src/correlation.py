@@ -0,0 +1,159 @@
+"""相关系数计算：完整矩阵与流式累计"""
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "ID_COLUMNS",
+    "numeric_columns",
+    "correlation_matrix",
+    "RunningCorrelation",
+    "PairwiseCorrelation",
+]
+
+# 数值形式的编号字段，计算相关系数没有意义
+ID_COLUMNS = frozenset((
+    "UID",
+    "SEC_UID",
+    "SHORT_ID",
+    "抖音号",
+    "作品ID",
+    "评论ID",
+    "回复ID",
+    "回复对象",
+))
+
+
+def numeric_columns(df: pd.DataFrame, ratio=0.5) -> pd.DataFrame:
+    """返回可以转换为数值的列，超过 ratio 比例的数据无法转换时舍弃该列"""
+    columns = {}
+    for i in df.columns:
+        if i in ID_COLUMNS:
+            continue
+        values = pd.to_numeric(df[i], errors="coerce")
+        if values.notna().sum() > ratio * len(values) and values.nunique() > 1:
+            columns[i] = values.astype(np.float64)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def correlation_matrix(df: pd.DataFrame, method="pearson") -> pd.DataFrame:
+    """
+    计算全部数值列的相关系数矩阵，缺失值按列对删除
+
+    :param method: pearson 或 spearman；spearman 先按列计算秩，再计算秩的 pearson 系数
+    """
+    df = numeric_columns(df)
+    if method == "spearman":
+        df = df.rank()
+    elif method != "pearson":
+        raise ValueError(f"不支持的相关系数：{method}")
+    return df.corr(method="pearson")
+
+
+class RunningCorrelation:
+    """
+    流式 Pearson 相关系数，逐块累计样本量、均值与离差积矩阵，
+    使用 Chan 合并公式更新，避免一次遍历中直接累计平方和造成的精度损失；
+    任意一列含有缺失值的数据行不参与统计（按行删除），用于回归等需要完整数据行的计算，
+    相关系数矩阵使用 PairwiseCorrelation
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        size = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))  # 离差积矩阵 Σ(x - x̄)(y - ȳ)
+
+    def update(self, chunk: pd.DataFrame):
+        """累计一个数据块，数据块需包含全部列"""
+        values = chunk[list(self.columns)].apply(
+            pd.to_numeric, errors="coerce").to_numpy(np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values):
+            mean = values.mean(axis=0)
+            centered = values - mean
+            self.combine(len(values), mean, centered.T @ centered)
+        return self
+
+    def merge(self, other: "RunningCorrelation"):
+        """合并另一个累计结果，例如并行计算的分片"""
+        if other.columns != self.columns:
+            raise ValueError("列名称不一致，无法合并")
+        if other.n:
+            self.combine(other.n, other.mean, other.comoment)
+        return self
+
+    def combine(self, n: int, mean: np.ndarray, comoment: np.ndarray):
+        total = self.n + n
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.n * n / total)
+        self.mean += delta * (n / total)
+        self.n = total
+
+    def covariance(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.comoment / max(self.n - 1, 1), index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = self.comoment / np.outer(std, std)
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
+
+
+class PairwiseCorrelation:
+    """
+    按列对删除缺失值的流式 Pearson 相关系数，与 correlation_matrix 的结果一致；
+    每个列对分别累计样本量、均值、平方离差和与离差积，稀疏列只影响包含该列的列对
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        size = len(self.columns)
+        self.n = np.zeros((size, size))  # 两列均不缺失的数据量
+        self.mean = np.zeros((size, size))  # mean[i, j]：列对 (i, j) 数据中第 i 列的均值
+        self.m2 = np.zeros((size, size))  # m2[i, j]：列对 (i, j) 数据中第 i 列的平方离差和
+        self.comoment = np.zeros((size, size))
+
+    def update(self, chunk: pd.DataFrame):
+        values = chunk[list(self.columns)].apply(
+            pd.to_numeric, errors="coerce").to_numpy(np.float64)
+        mask = ~np.isnan(values)
+        if not mask.any():
+            return self
+        # 先减去块内列均值，降低块内求和的精度损失；离差统计量不受平移影响
+        shift = np.nanmean(np.where(mask.any(axis=0), values, 0), axis=0)
+        values = np.where(mask, values - shift, 0)
+        weight = mask.astype(np.float64)
+        n = weight.T @ weight
+        total = values.T @ weight  # total[i, j]：列对 (i, j) 数据中第 i 列的和
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(n > 0, total / n, 0)
+        m2 = np.square(values).T @ weight - mean * total
+        comoment = values.T @ values - mean * total.T
+        self.combine(n, mean + shift[:, None], m2, comoment)
+        return self
+
+    def merge(self, other: "PairwiseCorrelation"):
+        if other.columns != self.columns:
+            raise ValueError("列名称不一致，无法合并")
+        self.combine(other.n, other.mean, other.m2, other.comoment)
+        return self
+
+    def combine(self, n, mean, m2, comoment):
+        total = self.n + n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(total > 0, n / total, 0)
+        delta = mean - self.mean
+        factor = self.n * ratio  # n₁n₂ / (n₁ + n₂)
+        self.m2 += m2 + np.square(delta) * factor
+        self.comoment += comoment + delta * delta.T * factor
+        self.mean += delta * ratio
+        self.n = total
+
+    def correlation(self) -> pd.DataFrame:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        result[self.n < 2] = np.nan
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
@@ -3,8 +3,17 @@
 import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
-from sklearn.linear_model import LinearRegression
 
+from src.correlation import PairwiseCorrelation
+from src.correlation import RunningCorrelation
+from src.correlation import correlation_matrix
+from src.correlation import numeric_columns
+from src.customizer import CORRELATION_STREAM_SIZE, PREPROCESS_CHUNK
+from src.dataloader import loader
+from src.regression import StreamingRegression
+from src.regression import parse_terms
+from src.rendering import Renderer
+from src.timefeatures import add_time_features
 from src.customizer import (
     INFO, 
     ERROR
@@ -27,58 +36,142 @@ class CorrelationAnalysis:
         self.y = y  # 因变量名称
         self.console = console
         self.filepath = filepath  # 文件路径
-        self.xv = None
-        self.yv = None
         self.point_sz = 3
+        self.render = Renderer(filepath.parent)
 
     def run(self) -> None:
-        self.work()
+        if self.x == "*":
+            self.matrix()
+        elif any(len(i) > 1 or logs for i, logs in map(parse_terms, (self.x, self.y))):
+            # 多元回归或对数变换直接进行回归分析
+            self.regress()
+        else:
+            self.work()
+
+    def frames(self):
+        """大文件按块读取，否则返回缓存中的完整数据表"""
+        if self.streaming():
+            chunks = loader.chunks(self.filepath, PREPROCESS_CHUNK)
+        else:
+            chunks = (loader.load(self.filepath, copy=False),)
+        for chunk in chunks:
+            yield add_time_features(chunk)  # 视频时长秒、发布小时、发布星期等派生变量
+
+    def check_columns(self, chunk, names) -> bool:
+        for i in names:
+            if i not in chunk.columns:
+                self.console.print(f"变量{i}不存在", style=ERROR)
+                return False
+        return True
 
     def work(self) -> None:
+        running = RunningCorrelation((self.x, self.y))
         try:
-            df = pd.read_excel(self.filepath)
-        except:
+            for chunk in self.frames():
+                if not running.n and not self.check_columns(chunk, (self.x, self.y)):
+                    return
+                running.update(chunk)  # 缺失值按行删除，均值使用浮点数计算
+        except FileNotFoundError:
             self.console.print(f"文件{self.filepath}不存在", style=ERROR)
             return
-        try:
-            x = np.array(df[self.x]).reshape(-1, 1)  # m*1
-            self.xv = x
-        except:
-            self.console.print(f"变量{self.x}不存在", style=ERROR)
-            return
-        try:
-            y = np.array(df[self.y]).reshape(-1, 1)  # m*1
-            self.yv = y
-        except:
-            self.console.print(f"变量{self.y}不存在", style=ERROR)
+        ppmcc = running.correlation().iloc[0, 1]
+        if not np.isfinite(ppmcc):
+            self.console.print(f"变量{self.x}或{self.y}没有有效的变化，无法计算相关系数", style=ERROR)
             return
-        x_mean = int(x.mean())
-        y_mean = int(y.mean())
-        x -= x_mean
-        y -= y_mean
-        ppmcc = np.sum(x * y) / (np.sqrt(np.dot(x.T, x)) * np.sqrt(np.dot(y.T, y)))[0][0]
         self.console.print(f'变量"{self.x}"与变量"{self.y}"之间的ppmcc值为：{ppmcc}', style=INFO)
         self.vis(ppmcc)
 
+    def streaming(self) -> bool:
+        return self.filepath.suffix == ".db" or self.filepath.stat().st_size > CORRELATION_STREAM_SIZE
+
+    def stream_pearson(self) -> pd.DataFrame:
+        """按块累计计算 Pearson 相关系数矩阵，缺失值按列对删除，内存占用与数据量无关"""
+        running = None
+        for chunk in loader.chunks(self.filepath, PREPROCESS_CHUNK):
+            chunk = add_time_features(chunk)
+            if running is None:
+                running = PairwiseCorrelation(numeric_columns(chunk).columns)
+            running.update(chunk)
+        return running.correlation() if running else pd.DataFrame()
+
+    def matrix(self) -> None:
+        """计算全部数值变量的相关系数矩阵，保存为 xlsx 文件与热力图"""
+        try:
+            if self.streaming():
+                results = {"Pearson": self.stream_pearson()}
+            else:
+                df = add_time_features(loader.load(self.filepath, copy=False))
+                results = {
+                    "Pearson": correlation_matrix(df),
+                    "Spearman": correlation_matrix(df, "spearman"),
+                }
+        except FileNotFoundError:
+            self.console.print(f"文件{self.filepath}不存在", style=ERROR)
+            return
+        if results["Pearson"].empty:
+            self.console.print(f"文件{self.filepath}没有可以计算的数值变量", style=ERROR)
+            return
+        save_path = self.filepath.parent.joinpath(f"{self.filepath.stem}_相关系数矩阵.xlsx")
+        with pd.ExcelWriter(save_path) as writer:
+            for name, matrix in results.items():
+                matrix.to_excel(writer, sheet_name=name)
+                self.console.print(f"{name} 相关系数矩阵：\n{matrix.round(3).to_string()}", style=INFO)
+                self.print_strong(name, matrix)
+                fig, ax = plt.subplots(figsize=(max(6, len(matrix) * 0.6),) * 2)
+                self.render.heatmap(matrix, ax)
+                ax.set_title(f"{self.filepath.stem} {name} 相关系数矩阵")
+                self.render.save(f"{self.filepath.stem}_{name}相关系数矩阵", fig)
+        self.console.print(f"相关系数矩阵已保存至 {save_path}，热力图已保存至 {self.render.root}", style=INFO)
+
+    def print_strong(self, name: str, matrix: pd.DataFrame) -> None:
+        upper = matrix.where(np.triu(np.ones(matrix.shape, dtype=bool), k=1)).stack()
+        for (x, y), value in upper[upper.abs() >= THRESHOLDS].items():
+            self.console.print(f'变量"{x}"与变量"{y}"存在强相关关系，{name} 系数为：{value:.4f}', style=INFO)
+
     def vis(self, ppmcc) -> None:
         if ppmcc < THRESHOLDS:
             return
         if self.console.input("当前两个变量存在强相关关系，是否进行回归？(YES/NO)：").upper() == "YES":
-            lin_reg = LinearRegression()
-            lin_reg.fit(self.xv, self.yv)
-            x_pred = np.linspace(self.xv.min(), self.xv.max(), 2).reshape(2, 1)
-            y_pred = x_pred * lin_reg.coef_ + lin_reg.intercept_
-            plt.scatter(self.xv, 
-                        self.yv, 
-                        label='用户数据', 
-                        s=self.point_sz)
-            plt.plot(x_pred, y_pred, 'r--', label=f"权重参数={lin_reg.coef_[0][0]}\n偏置参数={lin_reg.intercept_[0]}")
-            plt.xlabel(self.x)
-            plt.ylabel(self.y)
-            plt.title(f"{self.x}与{self.y}的线性回归")
-            plt.legend()
-            plt.show()
-
-
-
-            
\ No newline at end of file
+            self.regress()
+
+    def regress(self) -> None:
+        """按块累计统计量拟合线性回归，x 可以输入多个变量，log(变量名) 表示取对数"""
+        features, logs = parse_terms(self.x)
+        target, target_logs = parse_terms(self.y)
+        if not features or len(target) != 1:
+            self.console.print("回归分析需要至少一个自变量与一个因变量", style=ERROR)
+            return
+        model = StreamingRegression(features, target[0], logs, bool(target_logs))
+        try:
+            for chunk in self.frames():
+                if not model.moments.n and not self.check_columns(chunk, features + target):
+                    return
+                model.update(chunk)
+            model.fit()
+        except FileNotFoundError:
+            self.console.print(f"文件{self.filepath}不存在", style=ERROR)
+            return
+        except ValueError as error:
+            self.console.print(error, style=ERROR)
+            return
+        model.residuals(self.frames())
+        self.console.print(model.summary(), style=INFO)
+        if len(features) == 1:
+            self.plot(model)
+
+    def plot(self, model: StreamingRegression) -> None:
+        design = model.sample_frame()  # 按块读取时抽取的样本
+        x_name, y_name = model.names[0], model.target_name
+        x_pred = np.linspace(design[x_name].min(), design[x_name].max(), 2)
+        y_pred = x_pred * model.coef[0] + model.intercept
+        self.render.scatter(design[x_name],
+                            design[y_name],
+                            label='用户数据',
+                            s=self.point_sz)
+        plt.plot(x_pred, y_pred, 'r--', label=f"权重参数={model.coef[0]}\n偏置参数={model.intercept}\nR²={model.r2:.4f}")
+        plt.xlabel(x_name)
+        plt.ylabel(y_name)
+        plt.title(f"{x_name}与{y_name}的线性回归")
+        plt.legend()
+        path = self.render.save(f"{x_name}与{y_name}的线性回归")
+        self.console.print(f"图表已保存至 {path}", style=INFO)
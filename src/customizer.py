@@ -14,6 +14,85 @@ INFO = "b bright_green"
 # Cookie 更新间隔，单位：秒
 COOKIE_UPDATE_INTERVAL = 15 * 60
 
+# 多进程提取：每个分片包含的原始数据条数，以及启用多进程提取的最少数据条数
+EXTRACT_POOL_CHUNK = 500
+EXTRACT_POOL_THRESHOLD = 5000
+
+# SQLite 批量写入：缓冲数据达到条数或距上次提交超过秒数时提交事务
+SQL_BATCH_SIZE = 1000
+SQL_FLUSH_INTERVAL = 5
+
+# XLSX 写入：单个数据表最大行数；已有文件超过该大小（字节）时不再追加，改为写入新的分卷文件
+XLSX_MAX_ROWS = 100000
+XLSX_APPEND_LIMIT = 5 * 1024 * 1024
+
+# CSV 写入：写缓冲大小（字节）；每写入多少行或间隔多少秒刷新到磁盘，0 表示仅在结束时刷新
+CSV_BUFFER_SIZE = 1024 * 1024
+CSV_FLUSH_ROWS = 0
+CSV_FLUSH_INTERVAL = 0
+CSV_FSYNC = False  # 刷新时是否调用 fsync 确保数据落盘
+CSV_COMPRESS = False  # 是否使用 gzip 压缩输出
+
+# 后台线程写入数据，队列已满时采集线程等待写入线程
+ASYNC_RECORD = True
+ASYNC_QUEUE_SIZE = 64
+
+# 归档原始响应数据，用于离线重新提取，默认关闭；单个分段文件大小上限（字节）
+ARCHIVE_RAW = False
+ARCHIVE_SEGMENT_SIZE = 64 * 1024 * 1024
+
+# 输出文件分片：达到行数、文件大小（字节，仅支持 CSV 格式）或时间窗口（秒）后切换到新的分片，0 表示不限制
+SHARD_ROWS = 0
+SHARD_BYTES = 0
+SHARD_WINDOW = 0
+
+# 数据文件格式转换：子进程每次发送的数据行数，以及进程间队列容纳的数据块数量
+CONVERT_CHUNK = 2000
+CONVERT_QUEUE_SIZE = 16
+
+# 分析模块数据加载：是否生成二进制缓存文件，以及进程内缓存的数据表数量
+LOADER_SIDECAR = True
+LOADER_CACHE_SIZE = 8
+
+# 数据预处理：每次读取的数据行数，以及默认筛选条件
+PREPROCESS_CHUNK = 50000
+USER_MIN_FOLLOWER = 10000
+VIDEO_MIN_DIGG = 1000
+VIDEO_DATE_WINDOW = (None, None)  # 作品发布时间范围，例如 ("2023-01-01", "2023-12-31")
+
+# 异常账号检测：grid 为对数坐标网格密度估计，dbscan 为原始 DBSCAN 聚类；
+# 邻域半径为归一化后的比例，邻域内数据量少于 ANOMALY_MIN_SAMPLES 视为异常
+ANOMALY_METHOD = "grid"
+ANOMALY_EPS = 0.03
+ANOMALY_MIN_SAMPLES = 40
+
+# 图表渲染：默认使用 Agg 后端保存为图片文件，RENDER_SHOW 为 True 且存在显示环境时同时弹出窗口；
+# 散点数量超过 RENDER_DENSITY_THRESHOLD 时改为二维直方图密度渲染，不超过 RENDER_HOVER_LIMIT 时启用悬停提示
+RENDER_SHOW = False
+RENDER_FORMAT = "png"  # png 或 svg
+RENDER_DPI = 150
+RENDER_DENSITY_THRESHOLD = 50000
+RENDER_DENSITY_BINS = 200
+RENDER_HOVER_LIMIT = 5000
+
+# 相关性分析：数据文件超过该大小（字节）时按块流式计算相关系数矩阵，只计算 Pearson 系数
+CORRELATION_STREAM_SIZE = 256 * 1024 * 1024
+
+# 线性回归：绘制散点图时随机抽取的最大数据量，按块读取数据时抽样，内存占用与文件大小无关
+REGRESSION_PLOT_SAMPLE = 100000
+
+# 评论情感分析接口：并发请求数量、每秒最多请求次数、请求超时（秒）与失败重试次数
+SENTIMENT_WORKERS = 8
+SENTIMENT_QPS = 10
+SENTIMENT_TIMEOUT = 10
+SENTIMENT_RETRY = 3
+
+# 本地情感分析模型：模型文件名称（保存在数据文件夹的 Cache 文件夹）、每批分析的评论数量、
+# 积极概率与 0.5 的差值小于该值时判定为中性评论
+SENTIMENT_MODEL = "sentiment_model.joblib"
+SENTIMENT_BATCH = 10000
+SENTIMENT_NEUTRAL = 0.1
+
 def wait():
     """
     设置网络请求间隔时间
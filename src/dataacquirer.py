@@ -46,6 +46,7 @@ class Acquirer:
         self.console = params.console
         self.max_retry = params.max_retry  # 最大重试次数
         self.timeout = params.timeout
+        self.archive = params.archive
         self.cursor = 0  # 记录请求游标位置
         self.response = []  # 存储请求结果
         self.finished = False  # 标记请求状态
@@ -82,9 +83,17 @@ class Acquirer:
         except exceptions.ReadTimeout:
             return False
         try:
-            return response.json()
+            data = response.json()
         except exceptions.JSONDecodeError:
             return False
+        if self.archive and data:
+            self.archive.append(url, params, data)
+        return data
+
+    def close(self):
+        """关闭原始响应归档的索引数据库，下次写入时重新打开"""
+        if self.archive:
+            self.archive.close()
 
     def deal_url_params(self, params: dict, version=23):
         xb = self.xb.get_x_bogus(params, self.ua_code, version)
@@ -148,9 +157,12 @@ class Search(Acquirer):
             deal = self._run_general
         else:
             raise ValueError
-        while not self.finished and self.page > 0:
-            deal(data, self.tab)
-            self.page -= 1
+        try:
+            while not self.finished and self.page > 0:
+                deal(data, self.tab)
+                self.page -= 1
+        finally:
+            self.close()
         return self.response
 
     def _run_user_live(self, data: SimpleNamespace, type_: int):
@@ -241,6 +253,12 @@ class Comment(Acquirer):
         self.reply_ids = None
 
     def run(self, extractor: Extractor, recorder, source=False) -> list[dict]:
+        try:
+            return self._run(extractor, recorder, source)
+        finally:
+            self.close()
+
+    def _run(self, extractor: Extractor, recorder, source: bool) -> list[dict]:
         num = 1
         while not self.finished and self.pages > 0:
             self.console.print(f"正在获取第 {num} 页数据...")
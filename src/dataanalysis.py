@@ -7,6 +7,8 @@ from src.datapreprocessing import (
 from src.statisticaldesc import StatDesc
 from src.correlationanalysis import CorrelationAnalysis
 from src.emotionalanalysis import EmotionalAnalysis
+from src.converter import Converter
+from src.configuration import Settings
 from src.customizer import (
     INFO,
     ERROR,
@@ -29,7 +31,8 @@ class DataAnalysis:
                  "统计描述",  # 2
                  "相关性分析",  # 3
                  "评论情感分析",  # 4
-                 "计算综合互动指数"  # 5
+                 "计算综合互动指数",  # 5
+                 "数据文件格式转换",  # 6
                  ),
                 self.console)
             if select in {"Q", "q"}:
@@ -46,10 +49,22 @@ class DataAnalysis:
                 self.emotional_analysis()
             elif select == "5":
                 self.cal_score()
+            elif select == "6":
+                self.convert()
 
     def cal_score(self):
         self.console.print("计算完成，结果已保存到项目res文件夹下", style=INFO)
 
+    def convert(self):
+        format_ = self.console.input(
+            f"请输入目标储存格式：{", ".join(Converter.formats)}\n$ ")
+        if not format_:
+            return
+        try:
+            Converter(self.generate_dirpath(), format_, self.console).run()
+        except ValueError as error:
+            self.console.print(error, style=ERROR)
+
     def generate_dirpath(self):
         return self.root.joinpath("./data")
 
@@ -70,7 +85,8 @@ class DataAnalysis:
         if not bool(vfile_name := self.get_filename(tip=
                                                     "请输入需要预处理的视频数据文件名")):
             return
-        if not VedioDataFilter(vfile_name, self.console, dir_path).run():
+        date_format = Settings(self.root, self.console).read()["date_format"]
+        if not VedioDataFilter(vfile_name, self.console, dir_path, date_format).run():
             self.console.print("视频数据预处理失败", style=ERROR)
             return
         self.console.print("视频数据预处理成功", style=INFO)
@@ -89,9 +105,11 @@ class DataAnalysis:
         filename = self.get_filename(tip="请输入文件名")
         if not filename:
             return
-        if not (x := self.console.input(f"输入x变量名\n$ ")):
+        if not (x := self.console.input(f"输入x变量名，输入 * 计算全部数值变量的相关系数矩阵\n$ ")):
             return
-        if not (y := self.console.input(F"输入y变量名\n$ ")):
+        if x == "*":
+            y = "*"
+        elif not (y := self.console.input(F"输入y变量名\n$ ")):
             return
         filepath = self.generate_dirpath().joinpath(filename)
         CorrelationAnalysis(self.console, filepath, x, y).run()
@@ -1,13 +1,27 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 from datetime import datetime
 from json import dumps
+from os import cpu_count
 from time import localtime, strftime
 from types import SimpleNamespace
 
+from src.customizer import EXTRACT_POOL_CHUNK
+from src.records import CommentRecord
+from src.records import Record
+from src.records import SearchUserRecord
+from src.records import WorksRecord
+from src.recorder import NoneLogger
+from src.stringcleaner import Cleaner
 
-__all__ = ["Extractor"]
+
+__all__ = ["Extractor", "ExtractorPool"]
 
 
 class Extractor:
+    # 嵌套载荷保持原始字典，避免转换为 SimpleNamespace 后再次序列化
+    raw_keys = frozenset(("anchor_info",))
+
     def __init__(self, params):
         self.date_format = params.date_format
         self.cleaner = params.cleaner
@@ -17,13 +31,16 @@ class Extractor:
             "search": self.search,
         }
 
-    @staticmethod
-    def generate_data_object(data: dict) -> SimpleNamespace:
+    @classmethod
+    def generate_data_object(cls, data: dict) -> SimpleNamespace:
         """数据格式转化"""
+        raw_keys = cls.raw_keys
+
         def depth_conversion(element):
             if isinstance(element, dict):
                 return SimpleNamespace(
-                    **{k: depth_conversion(v) for k, v in element.items()})
+                    **{k: v if k in raw_keys else depth_conversion(v)
+                       for k, v in element.items()})
             elif isinstance(element, list):
                 return [depth_conversion(item) for item in element]
             else:
@@ -54,7 +71,7 @@ class Extractor:
                     return default
         return data or default
 
-    def run(self, data: list[dict], recorder, type_: str, **kwargs) -> list[dict]:
+    def run(self, data: list[dict], recorder, type_: str, **kwargs) -> list[Record]:
         if type_ not in self.type.keys():
             raise ValueError
         return self.type[type_](data, recorder, **kwargs)
@@ -75,7 +92,7 @@ class Extractor:
             self,
             container: SimpleNamespace,
             data: SimpleNamespace) -> None:
-        container.cache = container.template.copy()
+        container.cache = container.record(container.collection_time)
         self.extract_works_info(container.cache, data)
         self.extract_account_info(container, data)
         self.extract_music(container.cache, data)
@@ -85,7 +102,7 @@ class Extractor:
         self.extract_additional_info(container.cache, data)
         container.all_data.append(container.cache)
 
-    def extract_works_info(self, item: dict, data: SimpleNamespace) -> None:
+    def extract_works_info(self, item: Record, data: SimpleNamespace) -> None:
         item["id"] = self.safe_extract(data, "aweme_id")
         item["desc"] = self.clean_description(
             self.extract_description(data)) or item["id"]
@@ -126,7 +143,7 @@ class Extractor:
             container.cache["nickname"] = name
             container.cache["mark"] = name 
 
-    def extract_music(self, item: dict, data: SimpleNamespace) -> None:
+    def extract_music(self, item: Record, data: SimpleNamespace) -> None:
         if music_data := self.safe_extract(data, "music"):
             author = self.safe_extract(music_data, "author")
             title = self.safe_extract(music_data, "title")
@@ -138,7 +155,7 @@ class Extractor:
         item["music_title"] = title
         item["music_url"] = url
 
-    def extract_statistics(self, item: dict, data: SimpleNamespace) -> None:
+    def extract_statistics(self, item: Record, data: SimpleNamespace) -> None:
         data = self.safe_extract(data, "statistics")
         for i in (
                 "digg_count",
@@ -148,7 +165,7 @@ class Extractor:
         ):
             item[i] = str(self.safe_extract(data, i))
 
-    def extract_tags(self, item: dict, data: SimpleNamespace) -> None:
+    def extract_tags(self, item: Record, data: SimpleNamespace) -> None:
         if not (t := self.safe_extract(data, "video_tag")):
             tags = ["", "", ""]
         else:
@@ -156,28 +173,28 @@ class Extractor:
         for tag, value in zip(("tag_1", "tag_2", "tag_3"), tags):
             item[tag] = value
 
-    def _extract_extra_info(self, item: dict, data: SimpleNamespace):
+    def _extract_extra_info(self, item: Record, data: SimpleNamespace):
         if e := self.safe_extract(data, "anchor_info"):
+            # 原始字典直接紧凑序列化，不再缩进
             extra = dumps(
                 e,
                 ensure_ascii=False,
-                indent=2,
-                default=lambda x: vars(x))
+                separators=(",", ":"),
+                default=vars)
         else:
             extra = ""
         item["extra"] = extra
 
-    def extract_additional_info(self, item: dict, data: SimpleNamespace):
+    def extract_additional_info(self, item: Record, data: SimpleNamespace):
         item["height"] = self.safe_extract(data, "video.height")
         item["width"] = self.safe_extract(data, "video.width")
         item["ratio"] = self.safe_extract(data, "video.ratio")
 
-    def works(self, data: list[dict], recorder) -> list[dict]:
+    def works(self, data: list[dict], recorder) -> list[WorksRecord]:
         container = SimpleNamespace(
             all_data=[],
-            template={
-                "collection_time": datetime.now().strftime(self.date_format),
-            },
+            record=WorksRecord,
+            collection_time=datetime.now().strftime(self.date_format),
             cache=None,
             same=False,
         )
@@ -187,15 +204,14 @@ class Extractor:
         return container.all_data
 
     def comment(self, data: list[dict], recorder,
-                source=False) -> tuple[list[dict], list]:
+                source=False) -> tuple[list[CommentRecord | dict], list]:
         if not any(data):
             return [{}], []
         container = SimpleNamespace(
             all_data=[],
             reply_ids=[],
-            template={
-                "collection_time": datetime.now().strftime(self.date_format),
-            },
+            record=CommentRecord,
+            collection_time=datetime.now().strftime(self.date_format),
             cache=None,
             same=False,
         )
@@ -211,7 +227,7 @@ class Extractor:
             self,
             container: SimpleNamespace,
             data: SimpleNamespace):
-        container.cache = container.template.copy()
+        container.cache = container.record(container.collection_time)
         container.cache["create_time"] = self.format_date(data)
         container.cache["ip_label"] = self.safe_extract(data, "ip_label", "未知")
         container.cache["text"] = self.safe_extract(data, "text")
@@ -246,19 +262,18 @@ class Extractor:
         self._filter_reply_ids(container)
         container.all_data.append(data)
 
-    def search(self, data: list[dict], recorder, tab: int) -> list[dict]:
+    def search(self, data: list[dict], recorder, tab: int) -> list[Record]:
         if tab in {0, 1}:
             return self.search_general(data, recorder)
         elif tab == 2:
             return self.search_user(data, recorder)
 
-    def search_general(self, data: list[dict], recorder) -> list[dict]:
+    def search_general(self, data: list[dict], recorder) -> list[WorksRecord]:
         container = SimpleNamespace(
             all_data=[],
             cache=None,
-            template={
-                "collection_time": datetime.now().strftime(self.date_format),
-            },
+            record=WorksRecord,
+            collection_time=datetime.now().strftime(self.date_format),
             same=False,
         )
         [self._search_result_classify(container, self.generate_data_object(i)) for i in data]
@@ -278,28 +293,28 @@ class Extractor:
         elif d := self.safe_extract(data, "user_list[0].items"):
             [self.extract_batch(container, i) for i in d]
 
-    def search_user(self, data: list[dict], recorder) -> list[dict]:
+    def search_user(self, data: list[dict], recorder) -> list[SearchUserRecord]:
         container = SimpleNamespace(
             all_data=[],
             cache=None,
-            template={
-                "collection_time": datetime.now().strftime(self.date_format),
-            },
+            record=SearchUserRecord,
+            collection_time=datetime.now().strftime(self.date_format),
         )
         [self._deal_search_user_live(container, self.generate_data_object(i["user_info"])) for i in data]
         self.record_data(recorder, container.all_data)
         return container.all_data
 
-    def record_data(self, record, data: list[dict]):
-        for i in data:
-            record.save(self.extract_values(record, i))
+    @staticmethod
+    def record_data(record, data: list[Record]):
+        if data:
+            record.save_many([i.as_row() for i in data])
 
     def _deal_search_user_live(self,
                                container: SimpleNamespace,
                                data: SimpleNamespace,
                                user=True):
         if user:
-            container.cache = container.template.copy()
+            container.cache = container.record(container.collection_time)
         container.cache["avatar"] = self.safe_extract(data, f"{'avatar_thumb' if user else 'avatar_larger'}.url_list[0]")
         container.cache["nickname"] = self.safe_extract(data, "nickname")
         container.cache["sec_uid"] = self.safe_extract(data, "sec_uid")
@@ -314,11 +329,7 @@ class Extractor:
             container.cache["unique_id"] = self.safe_extract(data, "unique_id")
             container.all_data.append(container.cache)
 
-    @staticmethod
-    def extract_values(record, data: dict) -> list:
-        return [data[key] for key in record.field_keys]
-
-    def _extract_text_extra(self, item: dict, data: SimpleNamespace):
+    def _extract_text_extra(self, item: Record, data: SimpleNamespace):
         text = [
             self.safe_extract(i, "hashtag_name")
             for i in self.safe_extract(
@@ -327,7 +338,7 @@ class Extractor:
         ]
         item["text_extra"] = ", ".join(i for i in text if i)
 
-    def classifying_works(self, item: dict, data: SimpleNamespace) -> None:
+    def classifying_works(self, item: Record, data: SimpleNamespace) -> None:
         if images := self.safe_extract(data, "images"):
             self.extract_image_info(item, data, images)
         elif images := self.safe_extract(data, "image_post_info"):
@@ -337,7 +348,7 @@ class Extractor:
 
     def extract_image_info(
             self,
-            item: dict,
+            item: Record,
             data: SimpleNamespace,
             images: list) -> None:
         item["type"] = "图集"
@@ -345,17 +356,19 @@ class Extractor:
             self.safe_extract(
                 i, 'url_list[-1]') for i in images)
         item["duration"] = "00:00:00"
+        item["duration_ms"] = 0
         self.extract_cover(item, data)
 
     def extract_image_info_tiktok(
             self,
-            item: dict,
+            item: Record,
             data: SimpleNamespace,
             images: dict) -> None:
         item["type"] = "图集"
         item["downloads"] = " ".join(self.safe_extract(
             i, "display_image.url_list[-1]") for i in images["images"])
         item["duration"] = "00:00:00"
+        item["duration_ms"] = 0
         self.extract_cover(item, data)
 
     @staticmethod
@@ -373,17 +386,17 @@ class Extractor:
         3600 %
         60:0>2d}"
 
-    def extract_video_info(self, item: dict, data: SimpleNamespace) -> None:
+    def extract_video_info(self, item: Record, data: SimpleNamespace) -> None:
         item["type"] = "视频"
         item["downloads"] = self.safe_extract(
             data, "video.play_addr.url_list[-1]")
-        item["duration"] = self._time_conversion(
-            self.safe_extract(data, "video.duration", 0))
+        item["duration_ms"] = self.safe_extract(data, "video.duration", 0)
+        item["duration"] = self._time_conversion(item["duration_ms"])
         self.extract_cover(item, data, True)
 
     def extract_cover(
             self,
-            item: dict,
+            item: Record,
             data: SimpleNamespace,
             has=False) -> None:
         if has:
@@ -395,4 +408,58 @@ class Extractor:
                 data, "video.origin_cover.url_list[-1]")
         else:
             item["dynamic_cover"], item["origin_cover"] = "", ""
-       
\ No newline at end of file
+       
+
+_worker_extractor = None  # 子进程内复用的提取器
+
+
+def _init_worker(date_format: str, rule: dict) -> None:
+    global _worker_extractor
+    cleaner = Cleaner()
+    cleaner.set_rule(rule)  # 与主进程使用相同的非法字符字典
+    _worker_extractor = Extractor(
+        SimpleNamespace(date_format=date_format, cleaner=cleaner))
+
+
+def _extract_shard(shard: list[dict], type_: str, kwargs: dict):
+    """子进程提取一个分片，不写入记录器"""
+    return _worker_extractor.run(shard, NoneLogger(), type_, **kwargs)
+
+
+class ExtractorPool:
+    """多进程提取，分片后交由子进程执行 Extractor 的同一套逻辑"""
+
+    def __init__(self, params, workers: int = None, chunk=EXTRACT_POOL_CHUNK):
+        self.extractor = Extractor(params)  # 主进程负责写入记录器
+        self.date_format = params.date_format
+        self.rule = params.cleaner.rule
+        self.workers = workers or cpu_count() or 1
+        self.chunk = max(chunk, 1)
+
+    def shards(self, data: list[dict]) -> list[list[dict]]:
+        return [data[i:i + self.chunk] for i in range(0, len(data), self.chunk)]
+
+    def run(self, data: list[dict], recorder, type_: str, ordered=True, **kwargs):
+        if type_ not in self.extractor.type.keys():
+            raise ValueError
+        # 评论源数据模式不写入记录器
+        record = not (type_ == "comment" and kwargs.get("source"))
+        all_data, reply_ids = [], []
+        with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.date_format, self.rule)) as executor:
+            futures = [executor.submit(_extract_shard, i, type_, kwargs)
+                       for i in self.shards(data)
+                       if type_ != "comment" or any(i)]
+            for future in (futures if ordered else as_completed(futures)):
+                result = future.result()
+                if type_ == "comment":
+                    result, ids = result
+                    reply_ids.extend(ids)
+                if record:
+                    self.extractor.record_data(recorder, result)
+                all_data.extend(result)
+        if type_ == "comment":
+            return all_data or [{}], reply_ids
+        return all_data
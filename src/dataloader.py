@@ -0,0 +1,148 @@
+"""分析模块数据加载"""
+
+from collections import OrderedDict
+from hashlib import sha1
+from pathlib import Path
+from sqlite3 import connect
+from threading import Lock
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.customizer import LOADER_CACHE_SIZE, LOADER_SIDECAR
+
+__all__ = [
+    "DatasetLoader",
+    "loader",
+]
+
+
+class DatasetLoader:
+    """
+    首次读取 xlsx/csv 数据文件时转换为 pickle 二进制缓存文件，以文件路径、修改时间与大小作为缓存键，
+    源文件变化后自动重新解析；已加载的数据表保存在进程内 LRU 缓存中
+    """
+    folder = "Cache"  # 缓存文件夹，位于数据文件所在文件夹内
+    suffix = ".pkl"
+    version = 2  # 解析方式变化时修改，旧的缓存文件不再命中
+
+    def __init__(self, cache_size=LOADER_CACHE_SIZE, sidecar=LOADER_SIDECAR):
+        self.cache_size = max(cache_size, 0)
+        self.sidecar = sidecar
+        self.frames = OrderedDict()  # 缓存键: 数据表
+        self.lock = Lock()
+
+    @staticmethod
+    def key(path: Path) -> tuple:
+        stat = path.stat()
+        return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+    def sidecar_path(self, path: Path, key: tuple) -> Path:
+        digest = sha1(repr((self.version, key)).encode("UTF-8")).hexdigest()[:16]
+        return path.parent.joinpath(self.folder, f"{path.name}.{digest}{self.suffix}")
+
+    @staticmethod
+    def parse(path: Path) -> pd.DataFrame:
+        if path.name.endswith((".csv", ".csv.gz")):
+            return pd.read_csv(path)
+        # 记录器超出行数上限时新建数据表，合并全部数据表
+        sheets = [i for i in pd.read_excel(path, sheet_name=None).values() if len(i.columns)]
+        if not sheets:
+            return pd.DataFrame()
+        return pd.concat(sheets, ignore_index=True)
+
+    def read_sidecar(self, path: Path, key: tuple) -> pd.DataFrame:
+        if not self.sidecar:
+            return self.parse(path)
+        cache = self.sidecar_path(path, key)
+        if cache.exists():
+            try:
+                return pd.read_pickle(cache)
+            except Exception:
+                cache.unlink(missing_ok=True)  # 缓存文件损坏时重新解析
+        frame = self.parse(path)
+        self.write_sidecar(path, cache, frame)
+        return frame
+
+    def write_sidecar(self, path: Path, cache: Path, frame: pd.DataFrame):
+        cache.parent.mkdir(exist_ok=True)
+        for i in cache.parent.glob(f"{path.name}.*{self.suffix}"):
+            i.unlink(missing_ok=True)  # 删除源文件旧版本的缓存
+        temp = cache.with_suffix(".tmp")
+        frame.to_pickle(temp)
+        temp.replace(cache)
+
+    def load(self, path: Path, copy=True) -> pd.DataFrame:
+        """读取数据文件，copy 为 False 时返回缓存中的数据表，调用方不得修改"""
+        path = Path(path)
+        key = self.key(path)
+        with self.lock:
+            if (frame := self.frames.get(key)) is not None:
+                self.frames.move_to_end(key)
+            else:
+                frame = self.read_sidecar(path, key)
+                self.remember(key, frame)
+        return frame.copy() if copy else frame
+
+    def remember(self, key: tuple, frame: pd.DataFrame):
+        if not self.cache_size:
+            return
+        for i in [i for i in self.frames if i[0] == key[0]]:
+            del self.frames[i]  # 同一文件只保留最新版本
+        self.frames[key] = frame
+        while len(self.frames) > self.cache_size:
+            self.frames.popitem(last=False)
+
+    def chunks(self, path: Path, chunksize: int, table: str = None):
+        """
+        按块读取数据文件，不经过缓存，内存占用与文件大小无关
+
+        :param table: SQLite 数据库的数据表名称，默认读取第一个数据表
+        """
+        path = Path(path)
+        if path.name.endswith((".csv", ".csv.gz")):
+            yield from pd.read_csv(path, chunksize=chunksize)
+        elif path.suffix == ".db":
+            yield from self.sql_chunks(path, chunksize, table)
+        else:
+            yield from self.xlsx_chunks(path, chunksize)
+
+    @staticmethod
+    def xlsx_chunks(path: Path, chunksize: int):
+        # 记录器超出行数上限时新建数据表，每个数据表的第一行均为标题行
+        book = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in book.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                if not (header := next(rows, None)):
+                    continue
+                block = []
+                for row in rows:
+                    block.append(row)
+                    if len(block) >= chunksize:
+                        yield pd.DataFrame(block, columns=header)
+                        block = []
+                if block:
+                    yield pd.DataFrame(block, columns=header)
+        finally:
+            book.close()
+
+    @staticmethod
+    def sql_chunks(path: Path, chunksize: int, table: str = None):
+        db = connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            if not table:
+                table = db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid LIMIT 1;"
+                ).fetchone()[0]
+            yield from pd.read_sql_query(
+                f'SELECT * FROM "{table.replace('"', '""')}";', db, chunksize=chunksize)
+        finally:
+            db.close()
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+
+
+loader = DatasetLoader()  # 各分析模块共用的加载器
@@ -1,74 +1,222 @@
 """数据预处理模块"""
 
+from operator import eq, ge, gt, le, lt, ne
+from pathlib import Path
+
 import pandas as pd
+from openpyxl import Workbook
 
 from src.customizer import (
     INFO,
     ERROR
 )
+from src.customizer import XLSX_MAX_ROWS, PREPROCESS_CHUNK
+from src.customizer import USER_MIN_FOLLOWER, VIDEO_MIN_DIGG, VIDEO_DATE_WINDOW
+from src.datastore import DataStore
+from src.dataloader import loader
+from src.timefeatures import publish_time
 
 __all__ = [
+    "Threshold",
+    "Deduplicate",
+    "DateWindow",
+    "DropNull",
+    "FilterPipeline",
     "UserDataFilter",
     "VedioDataFilter"
 ]
 
+
+class Threshold:
+    """数值条件，无法转换为数值的数据视为不满足条件"""
+    operators = {
+        ">": gt,
+        ">=": ge,
+        "<": lt,
+        "<=": le,
+        "=": eq,
+        "!=": ne,
+    }
+
+    def __init__(self, column: str, operator: str, value):
+        self.column = column
+        self.operator = self.operators[operator]
+        self.value = value
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.Series:
+        return self.operator(pd.to_numeric(chunk[self.column], errors="coerce"), self.value)
+
+
+class Deduplicate:
+    """按键去重，保留第一次出现的数据；已出现的键跨数据块保存"""
+
+    def __init__(self, *columns: str):
+        self.columns = columns
+        self.seen = set()
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.Series:
+        if not (columns := [i for i in self.columns if i in chunk.columns]):
+            return pd.Series(True, index=chunk.index)
+        keys = pd.Series(
+            list(zip(*(chunk[i].astype(str) for i in columns))), index=chunk.index)
+        mask = ~keys.duplicated() & ~keys.isin(self.seen)
+        self.seen.update(keys[mask])
+        return mask
+
+
+class DateWindow:
+    """发布时间范围，包含起始时间，不包含结束时间；优先使用发布时间戳列"""
+
+    def __init__(self, since=None, until=None, date_format: str = None):
+        self.date_format = date_format
+        self.since = pd.Timestamp(since) if since else None
+        self.until = pd.Timestamp(until) if until else None
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(True, index=chunk.index)
+        if self.since is None and self.until is None:
+            return mask
+        date = publish_time(chunk, self.date_format)
+        if self.since is not None:
+            mask &= date >= self.since
+        if self.until is not None:
+            mask &= date < self.until
+        return mask
+
+
+class DropNull:
+    """删除指定列为空值或空字符串的数据"""
+
+    def __init__(self, *columns: str):
+        self.columns = columns
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(True, index=chunk.index)
+        for i in self.columns:
+            if i in chunk.columns:
+                mask &= chunk[i].notna() & (chunk[i].astype(str).str.strip() != "")
+        return mask
+
+
+class FilterPipeline:
+    """按块读取数据并依次应用筛选条件，符合条件的数据流式写入 xlsx 或 csv 文件"""
+
+    def __init__(self, steps: tuple, chunksize=PREPROCESS_CHUNK, max_rows=XLSX_MAX_ROWS):
+        self.steps = steps
+        self.chunksize = max(chunksize, 1)
+        self.max_rows = max_rows  # xlsx 单个数据表最大行数
+
+    def apply(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        # 依次筛选，去重条件只记录通过前面条件的数据
+        for step in self.steps:
+            if chunk.empty:
+                break
+            chunk = chunk[step(chunk)]
+        return chunk
+
+    def run(self, chunks, save_path: Path) -> tuple[int, int]:
+        """返回读取行数与保留行数"""
+        if save_path.name.endswith((".csv", ".csv.gz")):
+            return self.write_csv(chunks, save_path)
+        return self.write_xlsx(chunks, save_path)
+
+    def write_csv(self, chunks, save_path: Path) -> tuple[int, int]:
+        read, kept = 0, 0
+        save_path.unlink(missing_ok=True)
+        for chunk in chunks:
+            result = self.apply(chunk)
+            # 第一个数据块即使没有符合条件的数据，也写入标题行
+            result.to_csv(save_path, mode="a", header=not read, index=False)
+            read += len(chunk)
+            kept += len(result)
+        return read, kept
+
+    def write_xlsx(self, chunks, save_path: Path) -> tuple[int, int]:
+        read, kept, rows = 0, 0, 0
+        book = Workbook(write_only=True)
+        sheet = None
+        for chunk in chunks:
+            read += len(chunk)
+            result = self.apply(chunk)
+            result = result.astype(object).where(result.notna(), None)
+            if sheet is None:
+                sheet = book.create_sheet()
+                sheet.append(tuple(result.columns))
+                rows = 1
+            for row in result.itertuples(index=False, name=None):
+                if rows >= self.max_rows:
+                    sheet = book.create_sheet()
+                    sheet.append(tuple(result.columns))
+                    rows = 1
+                sheet.append(row)
+                rows += 1
+            kept += len(result)
+        if sheet is None:
+            book.create_sheet()
+        book.save(save_path)
+        book.close()
+        return read, kept
+
+
 class UserDataFilter:
-    def __init__(self, filename, console, dir_path) -> None:
+    label = "用户"
+    save_name = "user_data_proced.xlsx"
+    table = "authors"  # 数据仓库中的数据表
+    conditions = {"follower_count": (">", USER_MIN_FOLLOWER)}  # 数据仓库使用索引查询
+
+    def __init__(self, filename, console, dir_path, date_format: str = None) -> None:
         self.filename = filename
         self.console = console
         self.dir_path = dir_path
+        self.date_format = date_format  # 采集数据时使用的日期格式
         self.success = True
 
+    def steps(self) -> tuple:
+        return (
+            DropNull("粉丝数量", "获赞数量"),
+            Threshold("粉丝数量", ">", USER_MIN_FOLLOWER),
+            Deduplicate("SEC_UID"),
+        )
+
+    def chunks(self, file_path: Path, chunksize: int):
+        if file_path.name == DataStore.file:
+            with DataStore(self.dir_path) as store:
+                yield from store.frames(
+                    self.table, conditions=self.conditions, chunksize=chunksize)
+        else:
+            yield from loader.chunks(file_path, chunksize)
+
     def filter(self) -> None:
         file_path = self.dir_path.joinpath(self.filename)
-        try:
-            user_df = pd.read_excel(file_path)
-        except:
-            self.console.print(f"路径出错：{file_path}", style=ERROR)
-            self.success = False
-            return
-        user_df_filter = user_df[user_df["粉丝数量"] > 10000]
         save_path = self.generate_save_path()
-        if user_df_filter.to_excel(save_path, index=False):
-            self.console.print("保存用户文件失败", style=ERROR)
+        pipeline = FilterPipeline(self.steps())
+        try:
+            read, kept = pipeline.run(self.chunks(file_path, pipeline.chunksize), save_path)
+        except Exception as error:
+            self.console.print(f"处理{self.label}文件出错：{file_path}，{error!r}", style=ERROR)
             self.success = False
             return
-        self.console.print(f"用户文件已保存至 {save_path}", style=INFO)
+        self.console.print(f"{self.label}数据读取 {read} 条，保留 {kept} 条", style=INFO)
+        self.console.print(f"{self.label}文件已保存至 {save_path}", style=INFO)
 
     def generate_save_path(self):
-        return self.dir_path.joinpath("./user_data_proced.xlsx")
+        return self.dir_path.joinpath(self.save_name)
 
     def run(self) -> bool:
         self.filter()
         return self.success
 
 
-class VedioDataFilter:
-    def __init__(self, filename, console, dir_path) -> None:
-        self.filename = filename
-        self.console = console
-        self.dir_path = dir_path
-        self.success = True
-
-    def filter(self) -> None:
-        file_path = self.dir_path.joinpath(self.filename)
-        try:
-            vedio_df = pd.read_excel(file_path)
-        except:
-            self.console.print(f"路径出错：{file_path}", style=ERROR)
-            self.success = False
-            return
-        vedio_df_filter = vedio_df[vedio_df["点赞数量"] > 1000]
-        save_path = self.generate_save_path()
-        if vedio_df_filter.to_excel(save_path, index=False):
-            self.console.print("保存视频文件失败", style=ERROR)
-            self.success = False
-            return
-        self.console.print(f"视频文件已保存至 {save_path}", style=INFO)
-        
-    def generate_save_path(self):
-        return self.dir_path.joinpath("./vedio_data_proced.xlsx")
+class VedioDataFilter(UserDataFilter):
+    label = "视频"
+    save_name = "vedio_data_proced.xlsx"
+    table = "works_view"
+    conditions = {"digg_count": (">", VIDEO_MIN_DIGG)}
 
-    def run(self) -> bool:
-        self.filter()
-        return self.success
\ No newline at end of file
+    def steps(self) -> tuple:
+        return (
+            DropNull("点赞数量"),
+            Threshold("点赞数量", ">", VIDEO_MIN_DIGG),
+            DateWindow(*VIDEO_DATE_WINDOW, date_format=self.date_format),
+            Deduplicate("作品ID"),
+        )
@@ -0,0 +1,483 @@
+"""长期数据仓库：作品、评论与账号关联保存，建立索引，重复采集时更新统计数据"""
+
+from pathlib import Path
+from sqlite3 import connect
+from time import monotonic
+from types import SimpleNamespace
+
+from src.customizer import SQL_BATCH_SIZE, SQL_FLUSH_INTERVAL
+from src.records import CommentRecord
+from src.records import SearchUserRecord
+from src.records import WorksRecord
+
+__all__ = [
+    "DataStore",
+    "StoreLogger",
+]
+
+
+class DataStore:
+    """SQLite 数据仓库，作品、评论与账号分表关联保存，账号按 sec_uid 去重"""
+    file = "DataStore.db"
+    version = 1  # 数据库结构版本
+    pragmas = (
+        "PRAGMA journal_mode=WAL;",
+        "PRAGMA synchronous=NORMAL;",
+        "PRAGMA temp_store=MEMORY;",
+    )
+    integer_columns = frozenset((
+        "duration_ms",
+        "create_timestamp",
+        "user_age",
+        "digg_count",
+        "comment_count",
+        "collect_count",
+        "share_count",
+        "reply_comment_total",
+        "follower_count",
+        "total_favorited",
+        "anomaly",
+    ))
+    derived_columns = frozenset(("anomaly",))  # 分析结果字段，写入采集数据时不覆盖
+    operators = frozenset(("=", "!=", ">", ">=", "<", "<=", "LIKE"))
+    tables = {
+        "works": SimpleNamespace(
+            key="id",
+            columns=(
+                "id",
+                "type",
+                "collection_time",
+                "sec_uid",
+                "desc",
+                "text_extra",
+                "duration",
+                "create_time",
+                "downloads",
+                "music_author",
+                "music_title",
+                "music_url",
+                "origin_cover",
+                "dynamic_cover",
+                "tag_1",
+                "tag_2",
+                "tag_3",
+                "digg_count",
+                "comment_count",
+                "collect_count",
+                "share_count",
+                "extra",
+                "duration_ms",
+                "create_timestamp",
+            ),
+            indexes=(
+                "sec_uid",
+                "create_time",
+                "digg_count",
+                "tag_1",
+                "tag_2",
+                "tag_3",
+            ),
+        ),
+        "comments": SimpleNamespace(
+            key="cid",
+            columns=(
+                "cid",
+                "aweme_id",
+                "collection_time",
+                "create_time",
+                "sec_uid",
+                "ip_label",
+                "text",
+                "sticker",
+                "image",
+                "digg_count",
+                "reply_comment_total",
+                "reply_id",
+                "reply_to_reply_id",
+            ),
+            indexes=(
+                "aweme_id",
+                "sec_uid",
+                "reply_id",
+                "create_time",
+                "digg_count",
+                "ip_label",
+            ),
+        ),
+        "authors": SimpleNamespace(
+            key="sec_uid",
+            columns=(
+                "sec_uid",
+                "uid",
+                "unique_id",
+                "short_id",
+                "nickname",
+                "signature",
+                "user_age",
+                "avatar",
+                "verify",
+                "enterprise",
+                "follower_count",
+                "total_favorited",
+                "collection_time",
+                "anomaly",
+            ),
+            indexes=(
+                "follower_count",
+                "total_favorited",
+                "anomaly",
+            ),
+        ),
+    }
+    author_columns = (
+        "uid",
+        "unique_id",
+        "short_id",
+        "nickname",
+        "signature",
+        "user_age",
+    )
+    # 关联视图：(数据表别名, 字段)
+    views = {
+        "works_view": (
+            ("w", tables["works"].columns),
+            ("a", author_columns + ("follower_count", "total_favorited")),
+        ),
+        "comments_view": (
+            ("c", tables["comments"].columns),
+            ("a", author_columns),
+            ("w", ("type", "tag_1", "tag_2", "tag_3")),
+        ),
+    }
+    view_joins = {
+        "works_view": "works w LEFT JOIN authors a ON a.sec_uid = w.sec_uid",
+        "comments_view": "comments c LEFT JOIN authors a ON a.sec_uid = c.sec_uid "
+                         "LEFT JOIN works w ON w.id = c.aweme_id",
+    }
+    # 数据类型对应写入的数据表：(数据表, 更新字段)，账号信息只更新当前数据类型包含的字段
+    sources = {
+        "works": (
+            ("works", (
+                "collection_time",
+                "desc",
+                "digg_count",
+                "comment_count",
+                "collect_count",
+                "share_count",
+            )),
+            ("authors", author_columns + ("collection_time",)),
+        ),
+        "comment": (
+            ("comments", (
+                "collection_time",
+                "digg_count",
+                "reply_comment_total",
+            )),
+            ("authors", author_columns + ("collection_time",)),
+        ),
+        "search_user": (
+            ("authors", (
+                "uid",
+                "unique_id",
+                "short_id",
+                "nickname",
+                "signature",
+                "avatar",
+                "verify",
+                "enterprise",
+                "follower_count",
+                "total_favorited",
+                "collection_time",
+            )),
+        ),
+    }
+    records = {
+        "works": WorksRecord,
+        "comment": CommentRecord,
+        "search_user": SearchUserRecord,
+    }
+    titles = {
+        k: v for i in records.values() for k, v in zip(i.columns, i.titles)
+    } | {
+        "aweme_id": "作品ID",
+        "avatar": "头像链接",
+        "verify": "标签",
+        "enterprise": "企业",
+        "follower_count": "粉丝数量",
+        "total_favorited": "获赞数量",
+        "anomaly": "异常账号",
+    }
+
+    def __init__(self, root: Path):
+        self.path = root.joinpath(self.file)
+        self.db = None
+        self.columns = {}  # 数据表与视图包含的字段
+        self.writers = {}  # 各数据类型预先生成的写入语句与取值方法
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        self.db = connect(self.path)
+        for i in self.pragmas:
+            self.db.execute(i)
+        with self.db:
+            for name, table in self.tables.items():
+                self.create(name, table)
+                self.columns[name] = table.columns
+            for name in self.views:
+                self.create_view(name)
+            for type_ in self.sources:
+                self.writers[type_] = self.prepare(type_)
+            self.db.execute(f"PRAGMA user_version={self.version};")
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+    @staticmethod
+    def quote(column: str) -> str:
+        return f'"{column}"'
+
+    def column_type(self, table: SimpleNamespace, column: str) -> str:
+        type_ = "INTEGER" if column in self.integer_columns else "TEXT"
+        return f"{type_} PRIMARY KEY" if column == table.key else type_
+
+    def create(self, name: str, table: SimpleNamespace):
+        columns = ", ".join(
+            f"{self.quote(i)} {self.column_type(table, i)}" for i in table.columns)
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns});")
+        for i in table.indexes:
+            self.db.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{name}_{i} ON {name} ({self.quote(i)});")
+
+    def create_view(self, name: str):
+        columns, select = [], []
+        for alias, fields in self.views[name]:
+            columns.extend(fields)
+            select.extend(f"{alias}.{self.quote(i)}" for i in fields)
+        self.db.execute(f"DROP VIEW IF EXISTS {name};")
+        self.db.execute(
+            f"CREATE VIEW {name} AS SELECT {", ".join(select)} FROM {self.view_joins[name]};")
+        self.columns[name] = tuple(columns)
+
+    def writable(self, table: SimpleNamespace) -> tuple:
+        return tuple(i for i in table.columns if i not in self.derived_columns)
+
+    def upsert_sql(self, name: str, refresh: tuple) -> str:
+        table = self.tables[name]
+        columns = [self.quote(i) for i in self.writable(table)]
+        update = ", ".join(f"{i} = excluded.{i}" for i in map(self.quote, refresh))
+        return (f"INSERT INTO {name} ({", ".join(columns)}) VALUES ({
+        ", ".join("?" for _ in columns)}) ON CONFLICT ({self.quote(table.key)}) DO UPDATE SET {update};")
+
+    def upsert_sql_partial(self, name: str, fields: tuple) -> str:
+        """只写入部分字段，用于从作品或评论数据中补充账号信息"""
+        key = self.tables[name].key
+        columns = [self.quote(i) for i in (key,) + fields]
+        update = ", ".join(f"{i} = excluded.{i}" for i in columns[1:])
+        return (f"INSERT INTO {name} ({", ".join(columns)}) VALUES ({
+        ", ".join("?" for _ in columns)}) ON CONFLICT ({self.quote(key)}) DO UPDATE SET {update};")
+
+    def prepare(self, type_: str) -> list[SimpleNamespace]:
+        """生成数据类型对应的写入语句，以及从记录器数据行中取值的索引"""
+        source = self.records[type_].columns
+        writers = []
+        for name, refresh in self.sources[type_]:
+            table = self.tables[name]
+            if all(i in source or i == "aweme_id" for i in self.writable(table)):
+                fields, sql = self.writable(table), self.upsert_sql(name, refresh)
+            else:
+                fields = (table.key,) + refresh
+                sql = self.upsert_sql_partial(name, refresh)
+            writers.append(SimpleNamespace(
+                sql=sql,
+                index=[source.index(i) if i in source else None for i in fields],
+                key=fields.index(table.key),
+                integer=[n for n, i in enumerate(fields) if i in self.integer_columns],
+            ))
+        return writers
+
+    @staticmethod
+    def to_integer(value) -> int | None:
+        """
+        提取器将缺失值与 0 均记为空字符串，按原样写入 INTEGER 字段会保存为 TEXT，
+        比较时大于任何数值；空值或非数值数据写入 NULL
+        """
+        if value is None or value == "":
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            try:
+                return int(float(value))
+            except (TypeError, ValueError, OverflowError):
+                return None
+
+    def upsert_many(self, type_: str, rows: list, aweme_id=""):
+        """写入记录器数据行，已存在的数据更新统计数据；评论数据需要提供所属作品 ID"""
+        with self.db:
+            for writer in self.writers[type_]:
+                values = [
+                    [aweme_id if i is None else row[i] for i in writer.index]
+                    for row in rows]
+                for value in values:
+                    for i in writer.integer:
+                        value[i] = self.to_integer(value[i])
+                self.db.executemany(
+                    writer.sql, [i for i in values if i[writer.key]])
+
+    def update_column(self, name: str, column: str, rows):
+        """按主键更新单个字段，rows 为 (字段值, 主键) 序列，用于写回分析结果"""
+        self.check_column(self.check_name(name), column)
+        with self.db:
+            self.db.executemany(
+                f"UPDATE {name} SET {self.quote(column)} = ? WHERE {self.quote(self.tables[name].key)} = ?;",
+                rows)
+
+    def check_name(self, name: str) -> str:
+        if name not in self.columns:
+            raise ValueError(f"数据表 {name} 不存在")
+        return name
+
+    def check_column(self, name: str, column: str) -> str:
+        if column not in self.columns[name]:
+            raise ValueError(f"数据表 {name} 不存在字段 {column}")
+        return self.quote(column)
+
+    def where(self, name: str, conditions: dict = None) -> tuple[str, list]:
+        """
+        生成查询条件
+
+        :param conditions: {字段: 值} 或 {字段: (运算符, 值)}，例如 {"follower_count": (">", 10000)}
+        """
+        if not conditions:
+            return "", []
+        clauses, values = [], []
+        for column, condition in conditions.items():
+            operator, value = condition if isinstance(
+                condition, tuple) else ("=", condition)
+            if (operator := operator.upper()) not in self.operators:
+                raise ValueError(f"不支持的运算符 {operator}")
+            clauses.append(f"{self.check_column(name, column)} {operator} ?")
+            values.append(value)
+        return f" WHERE {" AND ".join(clauses)}", values
+
+    def select_sql(
+            self,
+            name: str,
+            columns: tuple = None,
+            conditions: dict = None,
+            order_by: str = None,
+            desc=False,
+            limit: int = None) -> tuple[str, list]:
+        columns = [self.check_column(name, i) for i in columns] if columns else ["*"]
+        where, values = self.where(name, conditions)
+        sql = f"SELECT {", ".join(columns)} FROM {self.check_name(name)}{where}"
+        if order_by:
+            sql += f" ORDER BY {self.check_column(name, order_by)}{" DESC" if desc else ""}"
+        if limit:
+            sql += " LIMIT ?"
+            values.append(limit)
+        return sql, values
+
+    def query(self, name: str, *args, **kwargs) -> list[tuple]:
+        """查询数据，参数同 select_sql"""
+        return self.db.execute(*self.select_sql(name, *args, **kwargs)).fetchall()
+
+    def count(self, name: str, conditions: dict = None) -> int:
+        where, values = self.where(name, conditions)
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM {self.check_name(name)}{where}", values).fetchone()[0]
+
+    def frame(self, name: str, columns: tuple = None, *args, titles=True, **kwargs):
+        """
+        查询数据并返回 DataFrame，titles 为真时使用中文列名，与导出文件保持一致
+
+        :param name: 数据表 works、comments、authors，或关联视图 works_view、comments_view
+        """
+        from pandas import read_sql_query
+
+        sql, values = self.select_sql(name, columns, *args, **kwargs)
+        df = read_sql_query(sql, self.db, params=values)
+        if titles:
+            df = df.rename(columns=self.column_titles(name))
+        return df
+
+    def frames(self, name: str, columns: tuple = None, *args, chunksize: int, titles=True, **kwargs):
+        """按块返回查询结果，参数同 frame"""
+        from pandas import read_sql_query
+
+        sql, values = self.select_sql(name, columns, *args, **kwargs)
+        for df in read_sql_query(sql, self.db, params=values, chunksize=chunksize):
+            yield df.rename(columns=self.column_titles(name)) if titles else df
+
+    def column_titles(self, name: str) -> dict:
+        """作品与评论的 create_time 中文列名不同，按数据表选择"""
+        record = self.records["comment" if name.startswith("comments") else "works"]
+        return self.titles | dict(zip(record.columns, record.titles))
+
+
+class StoreLogger:
+    """将采集数据写入数据仓库"""
+
+    def __init__(
+            self,
+            root: Path,
+            field_keys: tuple,
+            table: str,
+            aweme_id="",
+            batch_size=SQL_BATCH_SIZE,
+            flush_interval=SQL_FLUSH_INTERVAL,
+            *args,
+            **kwargs):
+        self.store = DataStore(root)
+        self.table = table  # 数据类型
+        self.aweme_id = aweme_id  # 评论所属作品 ID
+        self.field_keys = field_keys
+        self.buffer = []  # 待提交数据
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.last_flush = 0
+
+    def __enter__(self):
+        self.store.open()
+        self.last_flush = monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+        self.store.close()
+
+    def save(self, data, *args, **kwargs):
+        self.buffer.append(data)
+        self.check_flush()
+
+    def save_many(self, rows: list, *args, aweme_id=None, **kwargs):
+        """aweme_id 不为空时切换评论所属作品 ID，之前缓冲的数据先行提交"""
+        if aweme_id is not None and aweme_id != self.aweme_id:
+            self.flush()
+            self.aweme_id = aweme_id
+        self.buffer.extend(rows)
+        self.check_flush()
+
+    def check_flush(self):
+        if len(self.buffer) >= self.batch_size or monotonic(
+        ) - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    @staticmethod
+    def size() -> None:
+        """数据写入共享的数据库文件，无法统计单次输出的大小"""
+        return None
+
+    def flush(self):
+        if self.buffer:
+            self.store.upsert_many(self.table, self.buffer, self.aweme_id)
+            self.buffer.clear()
+        self.last_flush = monotonic()
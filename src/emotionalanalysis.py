@@ -1,17 +1,24 @@
 """评论情感分析模块"""
 
-import requests
-import json
 import re
+from pathlib import Path
+
 import pandas as pd
 from matplotlib import pyplot as plt
 import matplotlib
 
 from src.configuration import Settings
+from src.dataloader import loader
+from src.rendering import Renderer
+from src.sentiment import SentimentClient
+from src.sentimentcache import SentimentCache
+from src.sentimentmodel import SentimentModel
 from src.maincomplete import prompt
 from src.customizer import (
     ERROR,
     INFO,
+    WARNING,
+    SENTIMENT_MODEL,
 )
 
 # pd.pandas.set_option('display.max_rows', 200)  # debug
@@ -24,36 +31,12 @@ class EmotionalAnalysis:
         self.workid = workid
         self.vis = False  # 可视化标志位
         self.running = True
-        settings = Settings(self.root, self.console)
-        self.api_key = settings.read()['api_key']
-        self.secret_key = settings.read()['secret_key']
         self.filepath = filepath
-        self.savedf = pd.DataFrame(columns=[
-                    "评论内容", "confidence", "negative_prob", "positive_prob", "sentiment"])
-        self.url = "https://aip.baidubce.com/rpc/2.0/nlp/v1/sentiment_classify?charset=UTF-8&access_token=" + self.get_access_token()
-        self.payload = None
-        self.headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-
-    def get_access_token(self) -> str:
-        url = "https://aip.baidubce.com/oauth/2.0/token"
-        params = {"grant_type": "client_credentials", "client_id": self.api_key, "client_secret": self.secret_key}
-        return str(requests.post(url, params=params).json().get("access_token"))
-
-    def send_requests(self) -> json:
-        response = requests.request("POST", self.url, headers=self.headers, data=self.payload)
-        return json.loads(response.text)
-
-    def update_payload(self, comment) -> None:
-        payload = {
-            "text": f"{comment}"
-        }
-        self.payload = json.dumps(payload)
+        self.client = None  # 使用接口分析时创建
+        self.model = SentimentModel(self.root.joinpath("data", loader.folder, SENTIMENT_MODEL))
 
     def read_comments(self) -> pd.DataFrame:
-        comment_df = pd.read_excel(self.filepath)
+        comment_df = loader.load(self.filepath)
         # 判断评论中是否包含 '@' 符号
         comment_df['drop'] = comment_df["评论内容"].str.contains('@')
         # 删除包含 '@' 符号的评论
@@ -78,16 +61,26 @@ class EmotionalAnalysis:
         else:
             return False
 
+    def result_path(self) -> Path | None:
+        """返回待可视化的分析结果文件，接口与本地模型结果同时存在时由用户选择"""
+        paths = [i for i in (self.save_path, self.local_path) if i.is_file()]
+        if len(paths) < 2:
+            return paths[0] if paths else None
+        select = prompt(
+            "请选择分析结果来源",
+            ("接口分析结果", "本地模型分析结果"),
+            self.console,)
+        return self.local_path if select == "2" else self.save_path
+
     def emo_res_vis(self) -> None:
-        try:
-            df = pd.read_excel(self.root.joinpath(
-                f'./data/作品{self.workid}_评论感情色彩分析结果.xlsx'))
-        except:
+        if not (path := self.result_path()):
             if self.console.input(
                 f"作品{self.workid}对应的分析结果不存在，是否对其评论进行分析？(YES/NO)："
                 ).upper() == "YES":
                 self.callapi()
-                return
+            return
+        df = loader.load(path)
+        render = Renderer(self.root.joinpath("data"))  # 切换绘图后端会关闭已有图表，需在绘图前创建
         count_v = df["sentiment"].value_counts()
         labels = count_v.index.tolist()
         v = count_v.values.tolist()
@@ -101,7 +94,9 @@ class EmotionalAnalysis:
             f"{self.change_label(label)}: {value}" 
             for label, value in zip(labels, v)]
         plt.legend(legend_labels, loc='center left', bbox_to_anchor=(1, 0.5))
-        plt.show()
+        name = "本地" if path == self.local_path else ""
+        path = render.save(f"作品{self.workid}_评论情感正负性{name}饼图")
+        self.console.print(f"图表已保存至 {path}", style=INFO)
 
     def change_label(self, label: str) -> str:
         if str(label) == "0":
@@ -111,37 +106,80 @@ class EmotionalAnalysis:
         elif str(label) == "2":
             return "积极评论"
 
-    def add_df(self, text: dict) -> None:
-        row = [text["text"]]
-        for k, v in text["items"][0].items():
-            row.append(v)
-        self.savedf.loc[len(self.savedf.index)] = row
-        self.console.print(f'评论"{text["text"]}"分析成功', style=INFO)
+    @property
+    def save_path(self) -> Path:
+        return self.root.joinpath(f"./data/作品{self.workid}_评论感情色彩分析结果.xlsx")
+
+    @property
+    def local_path(self) -> Path:
+        # 本地模型结果单独保存，避免覆盖接口结果后又被用作训练数据
+        return self.root.joinpath(f"./data/作品{self.workid}_评论感情色彩本地分析结果.xlsx")
+
+    def comments(self) -> list[str]:
+        # 跳过空行与含Emoji表情的评论
+        return [v for v in self.read_comments() if v and not self.is_emoji(v)]
 
     def callapi(self) -> None:
-        comments = self.read_comments()
-        # self.console.print(comments)  # debug
-        for v in comments:
-            if not v:  # 空行
-                continue
-            if self.is_emoji(v):  # 含Emoji表情
-                continue
-            self.update_payload(v)
-            if resp := self.send_requests():
-                self.add_df(resp)
-                continue
-            self.console.print(f'评论"{v}"分析失败', style=ERROR)
-        self.savedf.to_excel(
-            self.root.joinpath(f"./data/作品{self.workid}_评论感情色彩分析结果.xlsx"),
-            index=False)
+        if not self.client:
+            settings = Settings(self.root, self.console).read()
+            self.client = SentimentClient(settings['api_key'], settings['secret_key'])
+        comments = self.comments()
+        checkpoint = self.save_path.with_suffix(".checkpoint.jsonl")
+        with SentimentCache(self.root.joinpath("data")) as cache:
+            df = self.client.run(comments, checkpoint, self.report, cache)
+            self.report_cache(cache)
+        df.to_excel(self.save_path, index=False)
+        if checkpoint.exists():
+            self.console.print(
+                f"部分评论分析失败，重新运行可继续分析，已完成的结果保存在 {checkpoint}", style=ERROR)
         self.console.print(f"作品{self.workid}评论分析结果已保存", style=INFO)
 
+    def train_model(self) -> bool:
+        """使用已保存的接口分析结果训练本地模型"""
+        paths = [
+            i for i in self.root.joinpath("data").glob("作品*_评论感情色彩分析结果.xlsx")
+            if not i.name.startswith("~$")]
+        if not paths:
+            self.console.print("没有可用于训练的评论分析结果，请先使用接口分析评论", style=WARNING)
+            return False
+        try:
+            count = self.model.train(paths)
+        except (KeyError, ValueError) as e:
+            self.console.print(f"训练本地模型失败：{e}", style=ERROR)
+            return False
+        self.model.save()
+        self.console.print(
+            f"本地模型训练完成，训练数据 {count} 条，模型已保存至 {self.model.path}", style=INFO)
+        return True
+
+    def local_analysis(self) -> None:
+        if not (self.model.trained or self.model.load() or self.train_model()):
+            return
+        with SentimentCache(self.root.joinpath("data")) as cache:
+            df = self.model.analyze(self.comments(), cache)
+            self.report_cache(cache)
+        df.to_excel(self.local_path, index=False)
+        self.console.print(
+            f"作品{self.workid}评论本地模型分析完成，共 {len(df)} 条，结果已保存至 {self.local_path}", style=INFO)
+
+    def report_cache(self, cache: SentimentCache) -> None:
+        if cache.hits:
+            self.console.print(f"{cache.hits} 条评论使用缓存的分析结果", style=INFO)
+
+    def report(self, text: str, result: dict | None) -> None:
+        if result is None:
+            self.console.print(f'评论"{text}"分析失败', style=ERROR)
+        else:
+            self.console.print(f'评论"{text}"分析成功', style=INFO)
+
     def run(self) -> None:
         while self.running:
             select = prompt(
                 "评论分析模块功能",
                 ("评论感情色彩分析",
-                "分析结果可视化",),
+                "分析结果可视化",
+                "本地模型评论感情色彩分析",
+                "使用已有分析结果训练本地模型",),
                 self.console,)
             if select in {"Q", "q"}:
                 self.running = False
@@ -151,6 +189,10 @@ class EmotionalAnalysis:
                 self.callapi()
             elif select == "2":
                 self.emo_res_vis()
+            elif select == "3":
+                self.local_analysis()
+            elif select == "4":
+                self.train_model()
 
 
 
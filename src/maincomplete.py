@@ -2,9 +2,11 @@
 
 from datetime import datetime
 
+from src.archive import Replayer
 from src.customizer import (
     WARNING,
-    INFO
+    INFO,
+    EXTRACT_POOL_THRESHOLD,
 )
 from src.dataacquirer import (
     Search,
@@ -13,6 +15,7 @@ from src.dataacquirer import (
 )
 
 from src.dataextractor import Extractor
+from src.dataextractor import ExtractorPool
 from src.recorder import RecordManager
 
 
@@ -92,6 +95,7 @@ class TikTok:
         self.console = parameter.console 
         self.links = Link()
         self.extractor = Extractor(parameter)  # 数据存储模块
+        self.pool = ExtractorPool(parameter)  # 大批量数据多进程提取
         self.storage = bool(parameter.storage_format)
         self.record = RecordManager()
         self.settings = parameter.settings
@@ -105,7 +109,8 @@ class TikTok:
                  "采集视频数据",
                  "手动采集评论数据",
                  "自动采集评论数据",
-                 "备用搜索接口"),
+                 "备用搜索接口",
+                 "重新提取归档数据"),
                 self.console)
             if select in {"Q", "q"}:
                 self.running = False
@@ -121,6 +126,8 @@ class TikTok:
                 self.comment_auto()
             elif select == "5":
                 self.search_interactive()  # 默认搜索模式
+            elif select == "6":
+                self.replay_interactive()
 
     @check_storage_format
     def search_interactive(self, mode: str = "0"):
@@ -138,9 +145,33 @@ class TikTok:
         if ids:
             for i in ids:
                 name = f"作品{i}_评论数据"
-                with logger(root, name=name, **params) as record:
+                with logger(root, name=name, aweme_id=i, **params) as record:
                     Comment(self.parameter, i).run(self.extractor, record)
 
+    @check_storage_format
+    def replay_interactive(self):
+        """将归档的原始响应重新提取并保存，不发送网络请求"""
+        if not self.parameter.archive:
+            self.console.print("未启用原始响应归档", style=WARNING)
+            return
+        key = self.console.input("请输入需要重新提取的搜索关键词或作品ID，直接回车处理全部归档数据\n$ ")
+        replayer = Replayer(self.parameter.archive, self.extractor, self.pool)
+        now = datetime.now().strftime("%Y-%m-%d %H.%M.%S")
+        try:
+            for (endpoint, item), rows in replayer.groups(key or None).items():
+                type_ = replayer.type_(endpoint)
+                root, params, logger = self.record.run(self.parameter, type_=type_)
+                if type_ == "comment":
+                    name, kwargs = f"作品{item}_评论数据", {"aweme_id": item}
+                else:
+                    name, kwargs = f"{now}_归档数据_{
+                        self.parameter.cleaner.filter_name(item, False, "全部")}", {}
+                with logger(root, name=name, **kwargs, **params) as record:
+                    replayer.run(endpoint, rows, record)
+                self.console.print(f"已重新提取 {len(rows)} 页归档数据，文件名为：\n{name}", style=INFO)
+        finally:
+            self.parameter.archive.close()
+
     @check_storage_format
     def comment_auto(self):
         while all(c := self._enter_search_comment_criteria()):
@@ -239,8 +270,9 @@ class TikTok:
         # 保存到本地
         name = self._generate_search_name(keyword, type_[1], sort[1], publish[1])
         root, params, logger = self.record.run(self.parameter, type_=self.DATA_TYPE[type_[0]])
+        extractor = self.pool if len(search_data) >= EXTRACT_POOL_THRESHOLD else self.extractor
         with logger(root, name=name, **params) as logger:
-            search_data = self.extractor.run(search_data, logger, type_="search", tab=type_[0])
+            search_data = extractor.run(search_data, logger, type_="search", tab=type_[0])
         self.console.print(f"数据采集成功，已成功保存到本地，文件名为：\n{name}", style=INFO)
         return search_data
 
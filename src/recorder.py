@@ -1,15 +1,44 @@
+from contextlib import ExitStack
+from csv import reader
 from csv import writer
-from os.path import getsize
+from datetime import datetime
+from functools import partial
+from gzip import GzipFile
+from gzip import open as gzip_open
+from json import dump
+from json import load
+from io import BufferedWriter
+from io import TextIOWrapper
+from os import fsync
 from pathlib import Path
 from platform import system
+from queue import Queue
 from sqlite3 import connect
+from threading import Event
+from threading import Thread
 from time import localtime
+from time import monotonic
 from time import strftime
 
 from openpyxl import Workbook
 from openpyxl import load_workbook
 
 from src.customizer import WARNING, ERROR, INFO
+from src.customizer import SQL_BATCH_SIZE, SQL_FLUSH_INTERVAL
+from src.customizer import XLSX_MAX_ROWS, XLSX_APPEND_LIMIT
+from src.customizer import ASYNC_RECORD, ASYNC_QUEUE_SIZE
+from src.customizer import SHARD_ROWS, SHARD_BYTES, SHARD_WINDOW
+from src.customizer import (
+    CSV_BUFFER_SIZE,
+    CSV_FLUSH_ROWS,
+    CSV_FLUSH_INTERVAL,
+    CSV_FSYNC,
+    CSV_COMPRESS,
+)
+from src.datastore import StoreLogger
+from src.records import CommentRecord
+from src.records import SearchUserRecord
+from src.records import WorksRecord
 from src.stringcleaner import Cleaner
 
 __all__ = [
@@ -18,6 +47,9 @@ __all__ = [
     'CSVLogger',
     'XLSXLogger',
     'SQLLogger',
+    'AsyncLogger',
+    'FanoutLogger',
+    'ShardedLogger',
     'RecordManager']
 
 
@@ -95,6 +127,13 @@ class NoneLogger:
     def save(self, *args, **kwargs):
         pass
 
+    def save_many(self, *args, **kwargs):
+        pass
+
+    def size(self) -> int | None:
+        """已写入的字节数，用于按文件大小分片；无法统计时返回 None"""
+        return None
+
     @staticmethod
     def _rename(root: Path, type_: str, old: str, new_: str) -> str:
         mark = new_.split("_", 1)
@@ -107,10 +146,18 @@ class NoneLogger:
             old_file.rename(new_file)
         return new_
 
+    @staticmethod
+    def _next_part(root: Path, name: str, type_: str, usable) -> Path:
+        """返回第一个可以继续写入或不存在的分卷文件路径"""
+        path, part = root.joinpath(f"{name}.{type_}"), 1
+        while path.exists() and not usable(path):
+            part += 1
+            path = root.joinpath(f"{name}_part{part}.{type_}")
+        return path
+
 
 class CSVLogger(NoneLogger):
-    """CSV格式记录"""
-    __type = "csv"
+    """CSV格式记录，支持批量写入、刷新策略与 gzip 压缩"""
 
     def __init__(
             self,
@@ -120,40 +167,110 @@ class CSVLogger(NoneLogger):
             id_: bool,
             old=None,
             name="Solo_Download",
+            buffer_size=CSV_BUFFER_SIZE,
+            flush_rows=CSV_FLUSH_ROWS,
+            flush_interval=CSV_FLUSH_INTERVAL,
+            fsync_=CSV_FSYNC,
+            compress=CSV_COMPRESS,
             *args,
             **kwargs):
         super().__init__(*args, **kwargs)
         self.file = None  # 文件对象
+        self.gzip = None  # gzip 文件对象
         self.writer = None  # CSV对象
-        self.name = self._rename(root, self.__type, old, name)  # 文件名称
-        self.path = root.joinpath(f"{self.name}.{self.__type}")  # 文件路径
+        self.type = "csv.gz" if compress else "csv"
+        self.root = root
+        self.name = self._rename(root, self.type, old, name)  # 文件名称
+        self.path = root.joinpath(f"{self.name}.{self.type}")  # 文件路径
         self.title_line = title_line  # 标题行
         self.field_keys = field_keys
         self.index = 1 if id_ else 0
+        self.buffer_size = buffer_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync_
+        self.compress = compress
+        self.pending = 0  # 上次刷新后写入的行数
+        self.last_flush = 0
 
     def __enter__(self):
-        self.file = self.path.open(
-            "a",
-            encoding="UTF-8-SIG" if system() == "Windows" else "UTF-8",
-            newline="")
+        encoding = "UTF-8-SIG" if system() == "Windows" else "UTF-8"
+        # 已有文件的标题行与当前字段不一致时，写入分卷文件
+        self.path = self._next_part(self.root, self.name, self.type, self.same_title)
+        if self.compress:
+            empty = not self.path.exists() or self.path.stat().st_size == 0
+            self.gzip = GzipFile(self.path, "ab")
+            self.file = TextIOWrapper(
+                BufferedWriter(self.gzip, self.buffer_size),
+                encoding=encoding,
+                newline="")
+        else:
+            self.file = self.path.open(
+                "a",
+                buffering=self.buffer_size,
+                encoding=encoding,
+                newline="")
+            empty = self.file.tell() == 0
         self.writer = writer(self.file)
-        self.title()
+        self.last_flush = monotonic()
+        self.title(empty)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
         self.file.close()
 
-    def title(self):
-        if getsize(self.path) == 0:
+    def title(self, empty: bool):
+        if empty:
             # 如果文件没有任何数据，则写入标题行
-            self.save(self.title_line[self.index:])
+            self.writer.writerow(self.title_line[self.index:])
+
+    def same_title(self, path: Path) -> bool:
+        if not path.stat().st_size:
+            return True
+        open_ = gzip_open if self.compress else open
+        with open_(path, "rt", encoding="UTF-8-SIG", newline="") as f:
+            return next(reader(f), []) == list(self.title_line[self.index:])
 
     def save(self, data, *args, **kwargs):
         self.writer.writerow(data)
+        self.pending += 1
+        self.check_flush()
+
+    def save_many(self, rows: list, *args, **kwargs):
+        self.writer.writerows(rows)
+        self.pending += len(rows)
+        self.check_flush()
+
+    def check_flush(self):
+        if self.flush_rows and self.pending >= self.flush_rows:
+            self.flush()
+        elif self.flush_interval and monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def size(self) -> int | None:
+        """
+        输出文件当前大小，包含写入缓冲区中的数据；压缩文件统计压缩后的大小，
+        不包含压缩器尚未输出的数据
+        """
+        if not self.file:
+            return 0
+        if self.gzip:
+            return self.gzip.fileobj.tell()
+        return self.file.buffer.tell()
+
+    def flush(self):
+        self.file.flush()
+        if self.gzip:
+            self.gzip.flush()
+        if self.fsync:
+            fsync(self.file.fileno())
+        self.pending = 0
+        self.last_flush = monotonic()
 
 
 class XLSXLogger(NoneLogger):
-    """XLSX格式"""
+    """XLSX格式，新文件使用只写模式流式写入"""
     __type = "xlsx"
 
     def __init__(
@@ -164,40 +281,93 @@ class XLSXLogger(NoneLogger):
             id_: bool,
             old=None,
             name="Solo_Download",
+            max_rows=XLSX_MAX_ROWS,
+            append_limit=XLSX_APPEND_LIMIT,
             *args,
             **kwargs):
         super().__init__(*args, **kwargs)
         self.book = None  # XLSX数据簿
         self.sheet = None  # XLSX数据表
+        self.root = root
         self.name = self._rename(root, self.__type, old, name)  # 文件名称
         self.path = root.joinpath(f"{self.name}.{self.__type}")
         self.title_line = title_line  # 标题行
         self.field_keys = field_keys
         self.index = 1 if id_ else 0
+        self.max_rows = max_rows  # 只写模式下单个数据表最大行数
+        self.append_limit = append_limit  # 允许追加写入的文件大小上限
+        self.write_only = True
+        self.rows = 0  # 当前数据表已写入行数
 
     def __enter__(self):
-        self.book = load_workbook(
-            self.path) if self.path.exists() else Workbook()
-        self.sheet = self.book.active
+        # 文件过大或标题行与当前字段不一致时不再追加，写入分卷文件
+        self.path = self._next_part(self.root, self.name, self.__type, self.appendable)
+        if self.path.exists():
+            self.write_only = False
+            self.book = load_workbook(self.path)
+            self.sheet = self.book.active
+        else:
+            self.book = Workbook(write_only=True)
+            self.sheet = self.book.create_sheet()
         self.title()
         return self
 
+    def appendable(self, path: Path) -> bool:
+        if path.stat().st_size > self.append_limit:
+            return False
+        book = load_workbook(path, read_only=True)
+        try:
+            title = list(next(book.active.iter_rows(max_row=1, values_only=True), ()))
+        finally:
+            book.close()
+        while title and title[-1] is None:
+            title.pop()
+        return not title or title == list(self.title_line[self.index:])
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.book.save(self.path)
         self.book.close()
 
     def title(self):
-        if not self.sheet["A1"].value:
+        if self.write_only:
+            self.sheet.append(self.title_line[self.index:])
+            self.rows = 1
+        elif not self.sheet["A1"].value:
             # 如果文件没有任何数据，则写入标题行
             for col, value in enumerate(self.title_line[self.index:], start=1):
                 self.sheet.cell(row=1, column=col, value=value)
 
     def save(self, data, *args, **kwargs):
+        if self.write_only and self.rows >= self.max_rows:
+            self.sheet = self.book.create_sheet()
+            self.title()
         self.sheet.append(data)
+        self.rows += 1
+
+    def save_many(self, rows: list, *args, **kwargs):
+        if not self.write_only:
+            for i in rows:
+                self.sheet.append(i)
+            return
+        start = 0
+        while start < len(rows):
+            if self.rows >= self.max_rows:
+                self.sheet = self.book.create_sheet()
+                self.title()
+            end = start + self.max_rows - self.rows
+            for i in rows[start:end]:
+                self.sheet.append(i)
+            self.rows += len(rows[start:end])
+            start = end
 
 
 class SQLLogger(NoneLogger):
-    """SQLite保存数据"""
+    """SQLite保存数据，缓冲数据并批量提交事务"""
+    pragmas = (
+        "PRAGMA journal_mode=WAL;",
+        "PRAGMA synchronous=NORMAL;",
+        "PRAGMA temp_store=MEMORY;",
+    )
 
     def __init__(
             self,
@@ -208,10 +378,19 @@ class SQLLogger(NoneLogger):
             field_keys: tuple,
             id_: bool,
             old=None,
-            name="Solo_Download", ):
-        super().__init__()
+            name="Solo_Download",
+            batch_size=SQL_BATCH_SIZE,
+            flush_interval=SQL_FLUSH_INTERVAL,
+            *args,
+            **kwargs):
+        super().__init__(*args, **kwargs)
         self.db = None  # 数据库
         self.cursor = None  # 游标对象
+        self.insert_sql = None  # 预先生成的插入语句
+        self.buffer = []  # 待提交数据
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.last_flush = 0
         self.name = (old, name)  # 数据表名称
         self.file = db_name  # 数据库文件名称
         self.path = root.joinpath(self.file)
@@ -222,26 +401,55 @@ class SQLLogger(NoneLogger):
 
     def __enter__(self):
         self.db = connect(self.path)
+        for i in self.pragmas:
+            self.db.execute(i)
         self.cursor = self.db.cursor()
         self.update_sheet()
         self.create()
+        self.insert_sql = self.prepare()
+        self.last_flush = monotonic()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
         self.db.close()
 
     def create(self):
         create_sql = f"""CREATE TABLE IF NOT EXISTS {self.name} ({", ".join(
             [f"{i} {j}" for i, j in zip(self.title_line, self.title_type)])});"""
         self.cursor.execute(create_sql)
+        # 旧版本数据表缺少的字段使用 ALTER TABLE 补充
+        exists = {i[1] for i in self.cursor.execute(f"PRAGMA table_info({self.name});")}
+        for i, j in zip(self.title_line, self.title_type):
+            if i not in exists:
+                self.cursor.execute(f"ALTER TABLE {self.name} ADD COLUMN {i} {j};")
         self.db.commit()
 
-    def save(self, data, *args, **kwargs):
+    def prepare(self) -> str:
         column = self.title_line[self.index:]
-        insert_sql = f"""REPLACE INTO {self.name} ({", ".join(column)}) VALUES ({
+        return f"""REPLACE INTO {self.name} ({", ".join(column)}) VALUES ({
         ", ".join(["?" for _ in column])});"""
-        self.cursor.execute(insert_sql, data)
-        self.db.commit()
+
+    def save(self, data, *args, **kwargs):
+        self.buffer.append(data)
+        self.check_flush()
+
+    def save_many(self, rows: list, *args, **kwargs):
+        self.buffer.extend(rows)
+        self.check_flush()
+
+    def check_flush(self):
+        if len(self.buffer) >= self.batch_size or monotonic(
+        ) - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """在一个事务中写入缓冲数据"""
+        if self.buffer:
+            with self.db:
+                self.cursor.executemany(self.insert_sql, self.buffer)
+            self.buffer.clear()
+        self.last_flush = monotonic()
 
     def update_sheet(self):
         old_sheet, new_sheet = self.name
@@ -257,68 +465,225 @@ class SQLLogger(NoneLogger):
         self.name = new_sheet
 
 
+class AsyncLogger:
+    """后台线程写入数据，被包装的记录器在写入线程中打开和关闭"""
+    __stop = object()
+
+    def __init__(self, logger, *args, queue_size=ASYNC_QUEUE_SIZE, **kwargs):
+        self.logger = logger(*args, **kwargs)
+        self.field_keys = self.logger.field_keys
+        self.queue = Queue(maxsize=queue_size)
+        self.ready = Event()
+        self.thread = None
+        self.error = None  # 写入线程发生的异常
+        self.sized = self.logger.size() is not None
+        self.written = 0  # 写入线程最近一次统计的字节数
+        self.queued = 0  # 放入队列的数据估算字节数
+        self.done = 0  # 写入线程已写入的数据估算字节数
+
+    def __enter__(self):
+        self.thread = Thread(target=self.work, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error:
+            self.thread.join()
+            raise self.error
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 等待队列中的数据全部写入后关闭记录器，中断时同样执行
+        self.queue.put(self.__stop)
+        self.thread.join()
+        if self.error and not exc_type:
+            raise self.error
+
+    def work(self):
+        try:
+            self.logger.__enter__()
+        except Exception as error:
+            self.error = error
+            return
+        finally:
+            self.ready.set()
+        try:
+            while (item := self.queue.get()) is not self.__stop:
+                if not self.error:
+                    self.write(*item)
+        finally:
+            self.logger.__exit__(None, None, None)
+
+    def write(self, method, data, args, kwargs, estimate: int):
+        try:
+            method(data, *args, **kwargs)
+            if self.sized:
+                self.written = self.logger.size()
+            self.done += estimate
+        except Exception as error:
+            self.error = error  # 发生异常后丢弃后续数据，由采集线程抛出
+
+    def put(self, method, data, args, kwargs, rows: list):
+        if self.error:
+            raise self.error
+        estimate = self.estimate(rows) if self.sized else 0
+        self.queued += estimate
+        self.queue.put((method, data, args, kwargs, estimate))  # 队列已满时阻塞
+
+    def save(self, data, *args, **kwargs):
+        self.put(self.logger.save, data, args, kwargs, [data])
+
+    def save_many(self, rows: list, *args, **kwargs):
+        self.put(self.logger.save_many, rows, args, kwargs, rows)
+
+    @staticmethod
+    def estimate(rows: list) -> int:
+        """按字段文本的 UTF-8 长度估算数据行写入后的字节数"""
+        return sum(len(str(i).encode("UTF-8")) + 1 for row in rows for i in row)
+
+    def size(self) -> int | None:
+        """写入线程统计的字节数，加上队列中尚未写入数据的估算字节数"""
+        if not self.sized:
+            return None
+        return self.written + self.queued - self.done
+
+
+class FanoutLogger:
+    """同一批数据写入多个记录器，数据行只生成一次"""
+
+    def __init__(self, loggers: tuple, *args, **kwargs):
+        self.loggers = [i(*args, **kwargs) for i in loggers]
+        self.field_keys = self.loggers[0].field_keys
+        self.stack = None
+
+    def __enter__(self):
+        with ExitStack() as stack:
+            for i in self.loggers:
+                stack.enter_context(i)
+            self.stack = stack.pop_all()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self.stack.__exit__(exc_type, exc_val, exc_tb)
+
+    def save(self, data, *args, **kwargs):
+        for i in self.loggers:
+            i.save(data, *args, **kwargs)
+
+    def save_many(self, rows: list, *args, **kwargs):
+        for i in self.loggers:
+            i.save_many(rows, *args, **kwargs)
+
+    def size(self) -> int | None:
+        """任意一个记录器无法统计时返回 None，否则返回最大的输出大小"""
+        sizes = [i.size() for i in self.loggers]
+        return None if None in sizes else max(sizes)
+
+
+class ShardedLogger:
+    """按行数、文件大小或时间窗口将输出切换到新的分片，并维护分片清单"""
+
+    def __init__(
+            self,
+            logger,
+            root: Path,
+            *args,
+            name="Solo_Download",
+            rows=SHARD_ROWS,
+            size=SHARD_BYTES,
+            window=SHARD_WINDOW,
+            **kwargs):
+        self.logger = logger  # 分片记录器
+        self.root = root
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.rows = rows
+        self.size = size
+        self.window = window
+        self.manifest = root.joinpath(f"{name}.manifest.json")
+        self.shards = self.read_manifest()  # 分片清单，同名输出继续编号
+        self.current = None  # 当前分片记录器
+        self.field_keys = None
+        self.opened = 0  # 当前分片创建时间
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(exc_type, exc_val, exc_tb)
+
+    def open(self):
+        name = f"{self.name}_shard{len(self.shards) + 1:04d}"
+        self.current = self.logger(self.root, *self.args, name=name, **self.kwargs)
+        if self.size and self.current.size() is None:
+            raise ValueError(
+                "SHARD_BYTES 仅支持 CSV 格式，当前储存格式无法统计输出大小，请改用 SHARD_ROWS 或 SHARD_WINDOW")
+        self.current.__enter__()
+        self.field_keys = self.current.field_keys
+        self.opened = monotonic()
+        self.shards.append({"name": name, "rows": 0, "start": None, "end": None})
+
+    def close(self, *exc_info):
+        self.current.__exit__(*exc_info)
+        self.write_manifest()
+
+    def read_manifest(self) -> list[dict]:
+        if not self.manifest.exists():
+            return []
+        with self.manifest.open("r", encoding="UTF-8") as f:
+            return load(f)["shards"]
+
+    def write_manifest(self):
+        """先写入临时文件再替换，避免读取到不完整的清单"""
+        temp = self.manifest.with_suffix(".tmp")
+        with temp.open("w", encoding="UTF-8") as f:
+            dump({"name": self.name, "shards": self.shards}, f, ensure_ascii=False, indent=2)
+        temp.replace(self.manifest)
+
+    def full(self) -> bool:
+        shard = self.shards[-1]
+        if self.rows and shard["rows"] >= self.rows:
+            return True
+        if self.window and monotonic() - self.opened >= self.window:
+            return True
+        if self.size and self.current.size() >= self.size:
+            return True
+        return False
+
+    def rotate(self):
+        self.close(None, None, None)
+        self.open()
+
+    def count(self, rows: int):
+        shard = self.shards[-1]
+        now = datetime.now().isoformat(timespec="seconds")
+        shard["start"] = shard["start"] or now
+        shard["end"] = now
+        shard["rows"] += rows
+
+    def save(self, data, *args, **kwargs):
+        if self.full():
+            self.rotate()
+        self.current.save(data, *args, **kwargs)
+        self.count(1)
+
+    def save_many(self, rows: list, *args, **kwargs):
+        start = 0
+        while start < len(rows):
+            if self.full():
+                self.rotate()
+            end = len(rows)
+            if self.rows:
+                end = min(end, start + self.rows - self.shards[-1]["rows"])
+            self.current.save_many(rows[start:end], *args, **kwargs)
+            self.count(end - start)
+            start = end
+
+
 class RecordManager:
     """检查数据储存路径和文件夹"""
-    works_keys = (
-        "type",
-        "collection_time",
-        "uid",
-        "sec_uid",
-        "unique_id",
-        "short_id",
-        "id",
-        "desc",
-        "text_extra",
-        "duration",
-        "create_time",
-        "nickname",
-        "user_age",
-        "signature",
-        "downloads",
-        "music_author",
-        "music_title",
-        "music_url",
-        "origin_cover",
-        "dynamic_cover",
-        "tag_1",
-        "tag_2",
-        "tag_3",
-        "digg_count",
-        "comment_count",
-        "collect_count",
-        "share_count",
-        "extra",
-    )
-    works_text = (
-        "作品类型",
-        "采集时间",
-        "UID",
-        "SEC_UID",
-        "抖音号",
-        "SHORT_ID",
-        "作品ID",
-        "作品描述",
-        "作品话题",
-        "视频时长",
-        "发布时间",
-        "账号昵称",
-        "年龄",
-        "账号签名",
-        "作品地址",
-        "音乐作者",
-        "音乐标题",
-        "音乐链接",
-        "静态封面",
-        "动态封面",
-        "标签_1",
-        "标签_2",
-        "标签_3",
-        "点赞数量",
-        "评论数量",
-        "收藏数量",
-        "分享数量",
-        "额外信息"
-    )
+    works_keys = WorksRecord.columns
+    works_text = WorksRecord.titles
     works_type = (
         "TEXT",
         "TEXT",
@@ -348,47 +713,11 @@ class RecordManager:
         "INTEGER",
         "INTEGER",
         "TEXT",
+        "INTEGER",
+        "INTEGER",
     )
-    comment_keys = (
-        "collection_time",
-        "cid",
-        "create_time",
-        "uid",
-        "sec_uid",
-        "short_id",
-        "unique_id",
-        "nickname",
-        "signature",
-        "user_age",
-        "ip_label",
-        "text",
-        "sticker",
-        "image",
-        "digg_count",
-        "reply_comment_total",
-        "reply_id",
-        "reply_to_reply_id",
-    )
-    comment_title = (
-        "采集时间",
-        "评论ID",
-        "评论时间",
-        "UID",
-        "SEC_UID",
-        "SHORT_ID",
-        "抖音号",
-        "账号昵称",
-        "账号签名",
-        "年龄",
-        "IP归属地",
-        "评论内容",
-        "评论表情",
-        "评论图片",
-        "点赞数量",
-        "回复数量",
-        "回复ID",
-        "回复对象",
-    )
+    comment_keys = CommentRecord.columns
+    comment_title = CommentRecord.titles
     comment_type = (
         "TEXT",
         "TEXT PRIMARY KEY",
@@ -409,34 +738,8 @@ class RecordManager:
         "TEXT",
         "TEXT",
     )
-    search_user_keys = (
-        "collection_time",
-        "uid",
-        "sec_uid",
-        "nickname",
-        "unique_id",
-        "short_id",
-        "avatar",
-        "signature",
-        "verify",
-        "enterprise",
-        "follower_count",
-        "total_favorited",
-    )
-    search_user_title = (
-        "采集时间",
-        "UID",
-        "SEC_UID",
-        "账号昵称",
-        "抖音号",
-        "SHORT_ID",
-        "头像链接",
-        "账号签名",
-        "标签",
-        "企业",
-        "粉丝数量",
-        "获赞数量",
-    )
+    search_user_keys = SearchUserRecord.columns
+    search_user_title = SearchUserRecord.titles
     search_user_type = (
         "TEXT",
         "TEXT",
@@ -458,6 +761,7 @@ class RecordManager:
             "title_type": works_type,
             "field_keys": works_keys,
             "id_": False,
+            "table": "works",
         },
         "comment": {
             "db_name": "CommentData.db",
@@ -465,6 +769,7 @@ class RecordManager:
             "title_type": comment_type,
             "field_keys": comment_keys,
             "id_": False,
+            "table": "comment",
         },
         "search_user": {
             "db_name": "SearchData.db",
@@ -472,12 +777,14 @@ class RecordManager:
             "title_type": search_user_type,
             "field_keys": search_user_keys,
             "id_": False,
+            "table": "search_user",
         },
     }
     DataLogger = {
         "csv": CSVLogger,
         "xlsx": XLSXLogger,
         "sql": SQLLogger,
+        "store": StoreLogger,
     }
 
     def run(
@@ -488,5 +795,16 @@ class RecordManager:
         root = parameter.root.joinpath(parameter.cleaner.filter_name(folder, False, "Data"))  # 文件存储路径
         root.mkdir(exist_ok=True)
         params = self.LoggerParams[type_]  # 对应参数体
-        logger = self.DataLogger.get(parameter.storage_format, NoneLogger)  # 对应本地保存器
+        loggers = [self.DataLogger[i] for i in parameter.storage_format]  # 对应本地保存器
+        if ASYNC_RECORD:
+            # 每个记录器使用独立的写入线程
+            loggers = [partial(AsyncLogger, i) for i in loggers]
+        if not loggers:
+            logger = NoneLogger
+        elif len(loggers) == 1:
+            logger = loggers[0]
+        else:
+            logger = partial(FanoutLogger, tuple(loggers))
+        if loggers and any((SHARD_ROWS, SHARD_BYTES, SHARD_WINDOW)):
+            logger = partial(ShardedLogger, logger)
         return root, params, logger
@@ -0,0 +1,203 @@
+"""采集数据记录类型"""
+
+from operator import attrgetter
+
+__all__ = [
+    "Record",
+    "WorksRecord",
+    "CommentRecord",
+    "SearchUserRecord",
+]
+
+
+class Record:
+    """使用 __slots__ 的数据记录，兼容按键读写，columns 为记录器列顺序"""
+    __slots__ = ()
+    columns = ()  # 字段名称
+    titles = ()  # 对应的中文列名
+    _row = None  # 按列顺序取值的 attrgetter
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._row = attrgetter(*cls.columns)
+
+    def __init__(self, collection_time=""):
+        for i in self.__slots__:
+            setattr(self, i, "")
+        self.collection_time = collection_time
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        setattr(self, key, value)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def as_row(self) -> tuple:
+        """按照记录器列顺序返回数据"""
+        return self._row(self)
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, i) for i in self.__slots__)
+
+    def to_dict(self) -> dict:
+        return {i: getattr(self, i) for i in self.__slots__}
+
+
+class WorksRecord(Record):
+    columns = (
+        "type",
+        "collection_time",
+        "uid",
+        "sec_uid",
+        "unique_id",
+        "short_id",
+        "id",
+        "desc",
+        "text_extra",
+        "duration",
+        "create_time",
+        "nickname",
+        "user_age",
+        "signature",
+        "downloads",
+        "music_author",
+        "music_title",
+        "music_url",
+        "origin_cover",
+        "dynamic_cover",
+        "tag_1",
+        "tag_2",
+        "tag_3",
+        "digg_count",
+        "comment_count",
+        "collect_count",
+        "share_count",
+        "extra",
+        "duration_ms",
+        "create_timestamp",
+    )
+    titles = (
+        "作品类型",
+        "采集时间",
+        "UID",
+        "SEC_UID",
+        "抖音号",
+        "SHORT_ID",
+        "作品ID",
+        "作品描述",
+        "作品话题",
+        "视频时长",
+        "发布时间",
+        "账号昵称",
+        "年龄",
+        "账号签名",
+        "作品地址",
+        "音乐作者",
+        "音乐标题",
+        "音乐链接",
+        "静态封面",
+        "动态封面",
+        "标签_1",
+        "标签_2",
+        "标签_3",
+        "点赞数量",
+        "评论数量",
+        "收藏数量",
+        "分享数量",
+        "额外信息",
+        "视频时长毫秒",
+        "发布时间戳",
+    )
+    __slots__ = columns + (
+        "mark",
+        "height",
+        "width",
+        "ratio",
+    )
+
+
+class CommentRecord(Record):
+    columns = (
+        "collection_time",
+        "cid",
+        "create_time",
+        "uid",
+        "sec_uid",
+        "short_id",
+        "unique_id",
+        "nickname",
+        "signature",
+        "user_age",
+        "ip_label",
+        "text",
+        "sticker",
+        "image",
+        "digg_count",
+        "reply_comment_total",
+        "reply_id",
+        "reply_to_reply_id",
+    )
+    titles = (
+        "采集时间",
+        "评论ID",
+        "评论时间",
+        "UID",
+        "SEC_UID",
+        "SHORT_ID",
+        "抖音号",
+        "账号昵称",
+        "账号签名",
+        "年龄",
+        "IP归属地",
+        "评论内容",
+        "评论表情",
+        "评论图片",
+        "点赞数量",
+        "回复数量",
+        "回复ID",
+        "回复对象",
+    )
+    __slots__ = columns + ("mark",)
+
+
+class SearchUserRecord(Record):
+    columns = (
+        "collection_time",
+        "uid",
+        "sec_uid",
+        "nickname",
+        "unique_id",
+        "short_id",
+        "avatar",
+        "signature",
+        "verify",
+        "enterprise",
+        "follower_count",
+        "total_favorited",
+    )
+    titles = (
+        "采集时间",
+        "UID",
+        "SEC_UID",
+        "账号昵称",
+        "抖音号",
+        "SHORT_ID",
+        "头像链接",
+        "账号签名",
+        "标签",
+        "企业",
+        "粉丝数量",
+        "获赞数量",
+    )
+    __slots__ = columns
@@ -0,0 +1,163 @@
+"""流式线性回归"""
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import RunningCorrelation
+from src.customizer import REGRESSION_PLOT_SAMPLE
+
+__all__ = [
+    "parse_terms",
+    "StreamingRegression",
+]
+
+
+def parse_terms(text: str) -> tuple[tuple, tuple]:
+    """
+    解析变量输入，多个变量使用逗号分隔，log(变量名) 表示取 log1p 对数
+
+    :return: (变量名称, 需要取对数的变量名称)
+    """
+    names, logs = [], []
+    for i in text.replace("，", ",").split(","):
+        if not (i := i.strip()):
+            continue
+        if i.lower().startswith("log(") and i.endswith(")"):
+            i = i[4:-1].strip()
+            logs.append(i)
+        names.append(i)
+    return tuple(names), tuple(logs)
+
+
+class StreamingRegression:
+    """
+    按块累计正规方程的充分统计量，使用中心化的离差积矩阵求解，
+    数据量较大时避免直接累计 XᵀX 造成的精度损失；支持多元回归与对数变换，
+    含有缺失值或对数变换无效的数据行不参与拟合
+    """
+
+    def __init__(
+            self,
+            features: tuple,
+            target: str,
+            log_features=(),
+            log_target=False,
+            sample_size=REGRESSION_PLOT_SAMPLE):
+        self.features = tuple(features)
+        self.target = target
+        self.log_features = frozenset(log_features)
+        self.log_target = log_target
+        self.moments = RunningCorrelation(self.names + (self.target_name,))
+        self.coef = None  # 各变量的权重参数
+        self.intercept = None  # 偏置参数
+        self.r2 = None
+        self.adj_r2 = None
+        self.rmse = None
+        self.residual = {}  # 残差统计
+        self.sample_size = sample_size
+        self.sample = None  # 变换后数据的均匀随机样本，用于绘图
+        self.random = np.random.default_rng(0)
+
+    @property
+    def names(self) -> tuple:
+        return tuple(f"log({i})" if i in self.log_features else i for i in self.features)
+
+    @property
+    def target_name(self) -> str:
+        return f"log({self.target})" if self.log_target else self.target
+
+    @staticmethod
+    def column(chunk: pd.DataFrame, name: str, log: bool) -> pd.Series:
+        values = pd.to_numeric(chunk[name], errors="coerce").astype(np.float64)
+        if log:
+            values = np.log1p(values.where(values >= 0))  # 负数无法取对数，视为缺失值
+        return values
+
+    def design(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """返回变换后的自变量与因变量"""
+        columns = {
+            name: self.column(chunk, i, i in self.log_features)
+            for i, name in zip(self.features, self.names)}
+        columns[self.target_name] = self.column(chunk, self.target, self.log_target)
+        return pd.DataFrame(columns, index=chunk.index)
+
+    def update(self, chunk: pd.DataFrame):
+        design = self.design(chunk)
+        self.moments.update(design)
+        if self.sample_size:
+            design = design.dropna()
+            self.keep_sample(design.assign(_key=self.random.random(len(design))))
+        return self
+
+    def merge(self, other: "StreamingRegression"):
+        self.moments.merge(other.moments)
+        if self.sample_size and other.sample is not None:
+            self.keep_sample(other.sample)
+        return self
+
+    def keep_sample(self, rows: pd.DataFrame):
+        """每行附带随机键，保留随机键最小的 sample_size 行，结果等价于对全部数据均匀抽样"""
+        if self.sample is not None:
+            rows = pd.concat((self.sample, rows), ignore_index=True)
+        self.sample = rows.nsmallest(self.sample_size, "_key") if len(rows) > self.sample_size else rows
+
+    def sample_frame(self) -> pd.DataFrame:
+        """返回抽样数据，列为变换后的自变量与因变量"""
+        if self.sample is None:
+            return pd.DataFrame(columns=self.names + (self.target_name,))
+        return self.sample.drop(columns="_key")
+
+    def fit(self):
+        """根据累计的统计量求解回归参数"""
+        size, n = len(self.features), self.moments.n
+        if n <= size:
+            raise ValueError(f"有效数据 {n} 条，不足以拟合 {size} 个变量")
+        moment, mean = self.moments.comoment, self.moments.mean
+        sxx, sxy, syy = moment[:size, :size], moment[:size, size], moment[size, size]
+        self.coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        self.intercept = mean[size] - self.coef @ mean[:size]
+        sse = max(syy - self.coef @ sxy, 0.0)
+        self.r2 = 1 - sse / syy if syy else float("nan")
+        self.adj_r2 = 1 - (1 - self.r2) * (n - 1) / (n - size - 1) if n > size + 1 else float("nan")
+        self.rmse = float(np.sqrt(sse / max(n - size - 1, 1)))
+        return self
+
+    def predict(self, chunk: pd.DataFrame) -> np.ndarray:
+        """返回变换后尺度的预测值"""
+        design = self.design(chunk)
+        return design[list(self.names)].to_numpy() @ self.coef + self.intercept
+
+    def residuals(self, chunks):
+        """再次按块读取数据，计算残差的最小值、最大值、平均绝对误差与标准差"""
+        count, total, squares, absolute = 0, 0.0, 0.0, 0.0
+        low, high = np.inf, -np.inf
+        for chunk in chunks:
+            design = self.design(chunk).dropna()
+            if design.empty:
+                continue
+            residual = design[self.target_name].to_numpy() - (
+                    design[list(self.names)].to_numpy() @ self.coef + self.intercept)
+            count += len(residual)
+            total += residual.sum()
+            squares += np.square(residual).sum()
+            absolute += np.abs(residual).sum()
+            low, high = min(low, residual.min()), max(high, residual.max())
+        if count:
+            mean = total / count
+            self.residual = {
+                "最小值": low,
+                "最大值": high,
+                "均值": mean,
+                "标准差": float(np.sqrt(max(squares / count - mean ** 2, 0.0))),
+                "平均绝对误差": absolute / count,
+            }
+        return self.residual
+
+    def summary(self) -> str:
+        lines = [f"因变量：{self.target_name}，有效数据：{self.moments.n} 条"]
+        lines.extend(f"权重参数 {name}：{value:.6g}" for name, value in zip(self.names, self.coef))
+        lines.append(f"偏置参数：{self.intercept:.6g}")
+        lines.append(f"R²：{self.r2:.4f}，调整 R²：{self.adj_r2:.4f}，RMSE：{self.rmse:.6g}")
+        if self.residual:
+            lines.append("残差：" + "，".join(f"{k} {v:.6g}" for k, v in self.residual.items()))
+        return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""图表渲染：保存为图片文件，大量散点使用密度渲染"""
+
+from os import environ
+from pathlib import Path
+from platform import system
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.colors import LogNorm
+
+from src.customizer import (
+    RENDER_SHOW,
+    RENDER_FORMAT,
+    RENDER_DPI,
+    RENDER_DENSITY_THRESHOLD,
+    RENDER_DENSITY_BINS,
+    RENDER_HOVER_LIMIT,
+)
+from src.stringcleaner import Cleaner
+
+__all__ = [
+    "Renderer",
+]
+
+
+def has_display() -> bool:
+    if system() != "Linux":
+        return True
+    return bool(environ.get("DISPLAY") or environ.get("WAYLAND_DISPLAY"))
+
+
+class Renderer:
+    """
+    图表保存到数据文件夹下的 Charts 文件夹；无显示环境或未启用 RENDER_SHOW 时
+    切换到 Agg 后端，绘图不会阻塞，可在服务器上批量生成图表
+    """
+    folder = "Charts"
+
+    def __init__(
+            self,
+            root: Path,
+            show=RENDER_SHOW,
+            format_=RENDER_FORMAT,
+            dpi=RENDER_DPI,
+            threshold=RENDER_DENSITY_THRESHOLD,
+            bins=RENDER_DENSITY_BINS,
+            hover_limit=RENDER_HOVER_LIMIT):
+        self.root = Path(root).joinpath(self.folder)
+        self.show = show and has_display()
+        self.format = format_
+        self.dpi = dpi
+        self.threshold = threshold
+        self.bins = bins
+        self.hover_limit = hover_limit
+        self.cleaner = Cleaner()
+        if not self.show:
+            plt.switch_backend("Agg")
+
+    def scatter(self, x, y, ax=None, s=3, hover=None, **kwargs):
+        """
+        绘制散点图，数据量超过阈值时使用 NumPy 计算二维直方图并按对数色阶渲染
+
+        :param hover: 悬停提示文本生成函数，参数为坐标 (x, y)，仅在交互显示且数据量较少时启用
+        """
+        ax = ax or plt.gca()
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if len(x) > self.threshold:
+            return self.density(ax, x, y)
+        artist = ax.scatter(x, y, s=s, **kwargs)
+        if hover and self.show and len(x) <= self.hover_limit:
+            self.hover(artist, hover)
+        return artist
+
+    def density(self, ax, x, y):
+        valid = np.isfinite(x) & np.isfinite(y)
+        counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=self.bins)
+        counts = np.ma.masked_equal(counts.T, 0)  # 空白网格不着色
+        mesh = ax.pcolormesh(x_edges, y_edges, counts, norm=LogNorm(), cmap="viridis")
+        ax.figure.colorbar(mesh, ax=ax, label="数据量")
+        return mesh
+
+    @staticmethod
+    def heatmap(matrix, ax=None, vmin=-1, vmax=1, cmap="coolwarm"):
+        """绘制带数值标注的矩阵热力图，matrix 为行列带标签的 DataFrame"""
+        ax = ax or plt.gca()
+        image = ax.imshow(matrix.to_numpy(), cmap=cmap, vmin=vmin, vmax=vmax)
+        ax.set_xticks(range(len(matrix.columns)), matrix.columns, rotation=45, ha="right")
+        ax.set_yticks(range(len(matrix.index)), matrix.index)
+        for (row, col), value in np.ndenumerate(matrix.to_numpy()):
+            if np.isfinite(value):
+                ax.text(col, row, f"{value:.2f}", ha="center", va="center", fontsize=7)
+        ax.figure.colorbar(image, ax=ax)
+        return image
+
+    @staticmethod
+    def hover(artist, text):
+        import mplcursors
+
+        cursor = mplcursors.cursor(artist, hover=True)
+
+        @cursor.connect("add")
+        def on_add(sel):
+            sel.annotation.set_text(text(*sel.target))
+
+    def save(self, name: str, fig=None) -> Path:
+        """保存图表并关闭，启用交互显示时先弹出窗口"""
+        fig = fig or plt.gcf()
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root.joinpath(
+            f"{self.cleaner.filter_name(name, False, "chart")}.{self.format}")
+        fig.savefig(path, dpi=self.dpi, bbox_inches="tight")
+        if self.show:
+            plt.show()
+        plt.close(fig)
+        return path
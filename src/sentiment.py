@@ -0,0 +1,260 @@
+"""评论情感分析：并发请求接口，断点续传"""
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from json import dumps
+from json import loads
+from pathlib import Path
+from re import compile
+from threading import Lock
+from time import monotonic
+from time import sleep
+from unicodedata import normalize
+
+import pandas as pd
+from requests import Session
+from requests import exceptions
+from requests.adapters import HTTPAdapter
+
+from src.customizer import (
+    SENTIMENT_WORKERS,
+    SENTIMENT_QPS,
+    SENTIMENT_TIMEOUT,
+    SENTIMENT_RETRY,
+)
+
+__all__ = [
+    "COLUMNS",
+    "normalize_text",
+    "group_texts",
+    "result_frame",
+    "TokenBucket",
+    "Checkpoint",
+    "SentimentClient",
+]
+
+COLUMNS = ("评论内容", "confidence", "negative_prob", "positive_prob", "sentiment")  # 分析结果列
+SPACE = compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """统一全角半角字符与大小写，合并连续空白字符"""
+    return SPACE.sub(" ", normalize("NFKC", str(text))).strip().lower()
+
+
+def group_texts(texts) -> dict[str, list[str]]:
+    """按规范化后的内容分组，每组只需分析一次"""
+    groups = {}
+    for text in dict.fromkeys(texts):
+        groups.setdefault(normalize_text(text), []).append(text)
+    return groups
+
+
+def result_frame(texts, results: dict) -> pd.DataFrame:
+    """按列收集结果，最后一次性生成数据表，没有分析结果的评论不保存"""
+    columns = {i: [] for i in COLUMNS}
+    for text in texts:
+        if (result := results.get(text)) is None:
+            continue
+        columns[COLUMNS[0]].append(text)
+        for key in COLUMNS[1:]:
+            columns[key].append(result.get(key))
+    return pd.DataFrame(columns, columns=COLUMNS)
+
+
+class TokenBucket:
+    """令牌桶限速，多个线程共用"""
+
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = max(rate, 0.001)  # 每秒生成的令牌数量
+        self.capacity = capacity or max(int(rate), 1)
+        self.tokens = self.capacity
+        self.last = monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            sleep(delay)
+
+
+class Checkpoint:
+    """分析结果逐行追加到 JSONL 文件，程序中断后重新运行时跳过已分析的评论"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = self.path.open("a", encoding="UTF-8")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.file.close()
+
+    def read(self) -> dict:
+        results = {}
+        if not self.path.exists():
+            return results
+        with self.path.open(encoding="UTF-8") as f:
+            for line in f:
+                try:
+                    item = loads(line)
+                except ValueError:
+                    continue  # 中断时未写完的最后一行
+                results[item["text"]] = item["result"]
+        return results
+
+    def write(self, text: str, result: dict):
+        self.file.write(dumps({"text": text, "result": result}, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def remove(self):
+        self.path.unlink(missing_ok=True)
+
+
+class SentimentClient:
+    """百度情感倾向分析接口，复用连接池并发请求，令牌桶限制请求频率"""
+    token_url = "https://aip.baidubce.com/oauth/2.0/token"
+    api_url = "https://aip.baidubce.com/rpc/2.0/nlp/v1/sentiment_classify"
+    retry_codes = {4, 17, 18, 282000}  # 频率限制与服务端临时错误，等待后重试
+    token_codes = {110, 111}  # access token 无效或已过期，重新获取后重试
+    keys = COLUMNS[1:]
+    model = "baidu:sentiment_classify"  # 缓存中区分分析结果来源
+    flush_size = 200  # 累计多少条新结果写入一次缓存
+
+    def __init__(
+            self,
+            api_key: str,
+            secret_key: str,
+            workers=SENTIMENT_WORKERS,
+            qps=SENTIMENT_QPS,
+            timeout=SENTIMENT_TIMEOUT,
+            retry=SENTIMENT_RETRY):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.workers = max(workers, 1)
+        self.bucket = TokenBucket(qps)
+        self.timeout = timeout
+        self.retry = retry
+        self.session = Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.workers))
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+        self.token = None  # 首次请求时获取
+        self.lock = Lock()
+
+    def access_token(self, expired: str = None) -> str:
+        """
+        返回 access token，多个线程共用
+
+        :param expired: 接口返回已失效的 token，与当前 token 相同时重新获取；其他线程已重新获取时直接返回
+        """
+        with self.lock:
+            if expired and self.token == expired:
+                self.token = None
+            if not self.token:
+                params = {
+                    "grant_type": "client_credentials",
+                    "client_id": self.api_key,
+                    "client_secret": self.secret_key}
+                self.token = str(self.session.post(
+                    self.token_url, params=params, timeout=self.timeout).json().get("access_token"))
+            return self.token
+
+    def classify(self, text: str) -> dict | None:
+        """返回情感分析结果，多次重试失败返回 None"""
+        token = None
+        for i in range(self.retry + 1):
+            self.bucket.acquire()
+            try:
+                token = self.access_token(token)
+                data = self.session.post(
+                    self.api_url,
+                    params={"charset": "UTF-8", "access_token": token},
+                    json={"text": text},
+                    timeout=self.timeout).json()
+            except (exceptions.RequestException, ValueError):
+                data = {}
+            if items := data.get("items"):
+                return {k: items[0].get(k) for k in self.keys}
+            code = data.get("error_code")
+            if code in self.token_codes:
+                continue  # 下次循环使用新的 token
+            token = None  # 只在 token 失效时重新获取
+            if data and code not in self.retry_codes:
+                return None
+            sleep(min(2 ** i, 10))
+        return None
+
+    def run(self, texts: list[str], checkpoint: Path, callback=None, cache=None) -> pd.DataFrame:
+        """
+        并发分析评论，规范化后相同的评论只请求一次；每条结果立即写入断点文件，全部完成后删除断点文件
+
+        :param callback: 每条评论完成后调用，参数为 (评论内容, 分析结果)，失败时分析结果为 None
+        :param cache: SentimentCache 对象，请求前先查询缓存，新的结果写入缓存
+        """
+        record = Checkpoint(checkpoint)
+        results = record.read()
+        fresh = dict(results)  # 尚未写入缓存的结果
+        if cache:
+            results |= cache.get_many((i for i in texts if i not in results), self.model)
+        groups = group_texts(i for i in texts if i not in results)
+        pending = iter(groups.values())
+        running = {}  # 正在请求的评论，数量保持在线程数的两倍以内，中断时不会积压大量请求
+        failed = False
+        executor = ThreadPoolExecutor(self.workers)
+        with record:
+            try:
+                for _ in range(self.workers * 2):
+                    self.submit(executor, running, pending)
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        group, result = running.pop(future), future.result()
+                        failed |= not self.collect(record, results, fresh, group, result)
+                        for text in group:
+                            if callback:
+                                callback(text, result)
+                        self.submit(executor, running, pending)
+                    if cache and len(fresh) >= self.flush_size:
+                        cache.put_many(fresh, self.model)
+                        fresh.clear()
+            except BaseException:
+                # 取消排队的请求，不再消耗接口额度；已完成的结果写入断点文件
+                executor.shutdown(wait=False, cancel_futures=True)
+                for future, group in running.items():
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        self.collect(record, results, fresh, group, future.result())
+                raise
+            executor.shutdown()
+        if cache:
+            cache.put_many(fresh, self.model)
+        if not failed:
+            record.remove()
+        return result_frame(texts, results)
+
+    def submit(self, executor: ThreadPoolExecutor, running: dict, pending):
+        if (group := next(pending, None)) is not None:
+            running[executor.submit(self.classify, group[0])] = group
+
+    @staticmethod
+    def collect(record: Checkpoint, results: dict, fresh: dict, group: list[str], result: dict | None) -> bool:
+        """保存一组评论的分析结果，分析失败返回 False"""
+        if result is None:
+            return False
+        for text in group:
+            results[text] = fresh[text] = result
+            record.write(text, result)
+        return True
@@ -0,0 +1,99 @@
+"""评论情感分析结果缓存：相同的评论内容只分析一次"""
+
+from hashlib import sha1
+from pathlib import Path
+from sqlite3 import connect
+
+from src.sentiment import COLUMNS
+from src.sentiment import normalize_text
+
+__all__ = [
+    "SentimentCache",
+]
+
+
+class SentimentCache:
+    """
+    SQLite 缓存，键为 (模型名称, 规范化评论内容) 的 SHA1 值；
+    接口与本地模型的结果分别缓存，本地模型重新训练后使用新的模型名称，旧结果不再命中
+    """
+    file = "SentimentCache.db"
+    version = 1  # 数据库结构版本
+    keys = COLUMNS[1:]
+    batch = 500  # 每次查询的键数量，低于 SQLite 参数数量上限
+    pragmas = (
+        "PRAGMA journal_mode=WAL;",
+        "PRAGMA synchronous=NORMAL;",
+    )
+
+    def __init__(self, root: Path):
+        self.path = root.joinpath(self.file)
+        self.db = None
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = connect(self.path)
+        for i in self.pragmas:
+            self.db.execute(i)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, model TEXT, "
+                "confidence REAL, negative_prob REAL, positive_prob REAL, sentiment INTEGER"
+                ") WITHOUT ROWID;")
+            self.db.execute(f"PRAGMA user_version={self.version};")
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+    @staticmethod
+    def key(text: str, model: str) -> str:
+        return sha1(f"{model}\0{normalize_text(text)}".encode("UTF-8")).hexdigest()
+
+    def get_many(self, texts, model: str) -> dict:
+        """
+        查询缓存结果，相同的评论只查询一次
+
+        :return: {评论内容: 分析结果}，未命中的评论不包含在内
+        """
+        keys = {}
+        for text in dict.fromkeys(texts):
+            keys.setdefault(self.key(text, model), []).append(text)
+        found = {}
+        items = list(keys)
+        for i in range(0, len(items), self.batch):
+            part = items[i:i + self.batch]
+            found.update((row[0], row[1:]) for row in self.db.execute(
+                f"SELECT key, {', '.join(self.keys)} FROM results "
+                f"WHERE key IN ({', '.join('?' * len(part))});", part))
+        results = {}
+        for key, group in keys.items():
+            if (row := found.get(key)) is None:
+                self.misses += len(group)
+                continue
+            self.hits += len(group)
+            for text in group:
+                results[text] = dict(zip(self.keys, row))
+        return results
+
+    def put_many(self, results: dict, model: str):
+        """保存分析结果，results 为 {评论内容: 分析结果}"""
+        if not results:
+            return
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO results (key, model, {', '.join(self.keys)}) "
+                f"VALUES ({', '.join('?' * (len(self.keys) + 2))});",
+                [(self.key(text, model), model, *(result.get(i) for i in self.keys))
+                 for text, result in results.items()])
@@ -0,0 +1,149 @@
+"""本地情感分析模型：字符 n-gram 哈希特征与线性分类器，离线批量分析评论"""
+
+from pathlib import Path
+from pickle import UnpicklingError
+from time import time_ns
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from src.customizer import (
+    SENTIMENT_BATCH,
+    SENTIMENT_NEUTRAL,
+)
+from src.dataloader import loader
+from src.sentiment import COLUMNS
+from src.sentiment import group_texts
+from src.sentiment import result_frame
+
+__all__ = [
+    "SentimentModel",
+]
+
+
+class SentimentModel:
+    """
+    使用接口分析结果训练的二分类模型，输出与接口一致的 sentiment、confidence、
+    positive_prob、negative_prob 列；哈希特征无需保存词表，模型文件大小固定
+    """
+    version = 1  # 特征或模型结构变化时修改，旧模型文件不再使用
+    NEGATIVE, NEUTRAL, POSITIVE = 0, 1, 2
+
+    def __init__(self, path: Path, neutral=SENTIMENT_NEUTRAL, batch=SENTIMENT_BATCH):
+        self.path = path
+        self.neutral = neutral
+        self.batch = max(batch, 1)
+        self.vectorizer = HashingVectorizer(
+            analyzer="char",
+            ngram_range=(1, 3),
+            n_features=2 ** 20,
+            alternate_sign=False,
+            lowercase=False)
+        self.model = None
+        self.stamp = 0  # 训练时间，区分同一版本多次训练的模型
+
+    @property
+    def trained(self) -> bool:
+        return self.model is not None
+
+    @property
+    def name(self) -> str:
+        """缓存中区分分析结果来源，重新训练后旧的缓存结果不再命中"""
+        return f"local:{self.version}:{self.stamp}"
+
+    @staticmethod
+    def read_results(paths) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """读取接口分析结果文件，相同的评论只保留最后一次结果"""
+        frames = [loader.load(i, copy=False)[list(COLUMNS)] for i in paths]
+        if not frames:
+            return [], np.empty(0), np.empty(0)
+        df = pd.concat(frames, ignore_index=True)
+        df["评论内容"] = df["评论内容"].astype(str)
+        df = df.dropna(subset=["positive_prob"]).drop_duplicates("评论内容", keep="last")
+        labels = (pd.to_numeric(df["positive_prob"], errors="coerce") >= 0.5).to_numpy(np.int64)
+        # 接口置信度较低的结果权重较小
+        weights = pd.to_numeric(df["confidence"], errors="coerce").fillna(0).clip(0.1, 1)
+        return df["评论内容"].tolist(), labels, weights.to_numpy(np.float64)
+
+    def train(self, paths) -> int:
+        """
+        使用接口分析结果训练模型，返回训练数据量
+
+        :param paths: 作品{id}_评论感情色彩分析结果.xlsx 文件路径
+        """
+        texts, labels, weights = self.read_results(paths)
+        if len(set(labels.tolist())) < 2:
+            raise ValueError("训练数据需要同时包含积极评论与消极评论")
+        self.model = SGDClassifier(
+            loss="log_loss",
+            alpha=1e-5,
+            class_weight="balanced",
+            max_iter=20,
+            tol=1e-4,
+            random_state=0)
+        self.model.fit(self.vectorizer.transform(texts), labels, sample_weight=weights)
+        self.stamp = time_ns()
+        return len(texts)
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        """返回积极评论概率，按批转换特征，避免一次生成过大的稀疏矩阵"""
+        result = np.empty(len(texts), dtype=np.float64)
+        for i in range(0, len(texts), self.batch):
+            features = self.vectorizer.transform(texts[i:i + self.batch])
+            result[i:i + self.batch] = self.model.predict_proba(features)[:, 1]
+        return result
+
+    def predict(self, texts: list[str]) -> pd.DataFrame:
+        texts = [str(i) for i in texts]
+        positive = self.predict_proba(texts)
+        distance = np.abs(positive - 0.5)
+        sentiment = np.where(
+            distance < self.neutral,
+            self.NEUTRAL,
+            np.where(positive > 0.5, self.POSITIVE, self.NEGATIVE))
+        return pd.DataFrame({
+            "评论内容": texts,
+            "confidence": distance * 2,
+            "negative_prob": 1 - positive,
+            "positive_prob": positive,
+            "sentiment": sentiment,
+        }, columns=COLUMNS)
+
+    def analyze(self, texts: list[str], cache=None) -> pd.DataFrame:
+        """
+        分析评论，规范化后相同的评论只计算一次
+
+        :param cache: SentimentCache 对象，计算前先查询缓存，新的结果写入缓存
+        """
+        results = cache.get_many(texts, self.name) if cache else {}
+        groups = list(group_texts(i for i in texts if i not in results).values())
+        if groups:
+            scored = self.predict([i[0] for i in groups])
+            fresh = {}
+            for group, row in zip(groups, scored[list(COLUMNS[1:])].to_dict("records")):
+                fresh.update((text, row) for text in group)
+            if cache:
+                cache.put_many(fresh, self.name)
+            results |= fresh
+        return result_frame(texts, results)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"version": self.version, "stamp": self.stamp, "model": self.model}, self.path)
+
+    def load(self) -> bool:
+        """读取模型文件，文件不存在或版本不一致时返回 False"""
+        if not self.path.is_file():
+            return False
+        try:
+            data = joblib.load(self.path)
+        except (OSError, EOFError, ValueError, UnpicklingError):
+            return False
+        if data.get("version") != self.version:
+            return False
+        self.model = data["model"]
+        self.stamp = data.get("stamp", 0)
+        return True
@@ -1,12 +1,21 @@
 """统计描述模块"""
 
-import pandas as pd
 import numpy as np
+import pandas as pd
 from matplotlib import pyplot as plt
-import mplcursors
 from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.linear_model import LinearRegression
+
+from src.anomaly import GridDensity
+from src.customizer import INFO, ERROR
+from src.customizer import PREPROCESS_CHUNK
+from src.customizer import ANOMALY_METHOD, ANOMALY_EPS, ANOMALY_MIN_SAMPLES
+from src.dataloader import loader
+from src.datastore import DataStore
+from src.regression import StreamingRegression
+from src.rendering import Renderer
+from src.timefeatures import WEEKDAYS
+from src.timefeatures import add_time_features
 
 
 plt.rcParams['font.sans-serif'] = ['SimHei']
@@ -26,77 +35,142 @@ class StatDesc:
         self.vpath = dir_path.joinpath(f"./{vedio_filename}")
         self.console = console
         self.point_sz = 3
+        self.render = Renderer(dir_path)
 
     def run(self) -> None:
         if self.user_filename:
             self.udata_vis()
         if self.vedio_filename:
             self.vdata_vis()
+        self.console.print(f"图表已保存至 {self.render.root}", style=INFO)
 
     def udata_vis(self) -> None:
         self.udata_linreg()
-        self.udata_dbscn()
+        self.udata_anomaly()
 
-    def udata_dbscn(self, eps:float = 0.03, min_samples:int = 40) -> None:
-        data = pd.read_excel(self.upath)
-        X = data[['粉丝数量', '获赞数量']].values
-        scaler = MinMaxScaler()
-        X_scaled = scaler.fit_transform(X)
-        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
-        dbscan.fit(X_scaled)
-        labels = dbscan.labels_
+    def read_users(self):
+        if self.upath.name == DataStore.file:
+            with DataStore(self.upath.parent) as store:
+                return store.frame("authors")
+        return loader.load(self.upath, copy=False)
+
+    def udata_anomaly(
+            self,
+            method: str = ANOMALY_METHOD,
+            eps: float = ANOMALY_EPS,
+            min_samples: int = ANOMALY_MIN_SAMPLES) -> None:
+        data = self.read_users()
+        X = data[['粉丝数量', '获赞数量']].apply(pd.to_numeric, errors="coerce").values
+        # 粉丝数量或获赞数量缺失的账号不参与检测，也不写回标记
+        valid = np.isfinite(X).all(axis=1)
+        if not valid.any():
+            self.console.print("没有粉丝数量与获赞数量完整的账号数据", style=ERROR)
+            return
+        data, X = data[valid], X[valid]
+        if method == "dbscan":
+            labels = self.udata_dbscn(X, eps, min_samples)
+        else:
+            labels = GridDensity(eps, min_samples).fit_predict(X)
+        self.console.print(
+            f"共 {len(labels)} 个账号，检测到 {int((labels == -1).sum())} 个异常账号", style=INFO)
+        self.save_labels(data, labels)
         fig, ax = plt.subplots()
-        scatter = ax.scatter(X[:, 0], X[:, 1], c=labels, cmap='viridis', s=self.point_sz)
+        for mask, label, color in ((labels != -1, "正常账号", None), (labels == -1, "异常账号", "red")):
+            self.render.scatter(X[mask, 0], X[mask, 1], ax=ax, s=self.point_sz,
+                                label=label, color=color, hover=self.user_hover)
         plt.title('异常账号检测结果')
         plt.xlabel('粉丝数量')
         plt.ylabel('获赞数量')
-        cursor = mplcursors.cursor(scatter, hover=True)
-        @cursor.connect("add")
-        def on_add(sel):
-            x, y = sel.target
-            label = f"粉丝数量: {x}\n获赞数量: {y}"
-            sel.annotation.set_text(label)
-        plt.show()
+        plt.legend()
+        self.render.save('异常账号检测结果', fig)
+
+    @staticmethod
+    def user_hover(x, y) -> str:
+        return f"粉丝数量: {x}\n获赞数量: {y}"
+
+    @staticmethod
+    def udata_dbscn(X, eps: float = 0.03, min_samples: int = 40):
+        scaler = MinMaxScaler()
+        X_scaled = scaler.fit_transform(X)
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
+        dbscan.fit(X_scaled)
+        return dbscan.labels_
+
+    def save_labels(self, data, labels) -> None:
+        """数据文件夹存在数据仓库时，按 SEC_UID 写回异常账号标记"""
+        if "SEC_UID" not in data.columns or not self.upath.parent.joinpath(
+                DataStore.file).exists():
+            return
+        with DataStore(self.upath.parent) as store:
+            store.update_column("authors", "anomaly", zip(
+                (labels == -1).astype(int).tolist(), data["SEC_UID"].astype(str)))
+        self.console.print("异常账号标记已写入数据仓库", style=INFO)
+
+    def user_chunks(self):
+        if self.upath.name == DataStore.file:
+            with DataStore(self.upath.parent) as store:
+                yield from store.frames("authors", chunksize=PREPROCESS_CHUNK)
+        else:
+            yield from loader.chunks(self.upath, PREPROCESS_CHUNK)
 
     def udata_linreg(self) -> None:
-        df = pd.read_excel(self.upath)
-        x_v = np.array(df['粉丝数量']).reshape(-1, 1)
-        y_v = np.array(df['获赞数量']).reshape(-1, 1)
-        lin_reg = LinearRegression()
-        lin_reg.fit(x_v, y_v)
-        x_pred = np.linspace(x_v.min(), x_v.max(), 2).reshape(-1, 1)
-        y_pred = x_pred * lin_reg.coef_ + lin_reg.intercept_
-        plt.scatter(x_v, 
-                    y_v, 
-                    label="用户数据",
-                    s=self.point_sz)
-        plt.plot(x_pred, y_pred, 'r--', label=f"权重参数={lin_reg.coef_[0][0]}\n偏置参数={lin_reg.intercept_[0]}")
+        # 按块累计统计量拟合，不需要一次读取全部数据
+        model = StreamingRegression(("粉丝数量",), "获赞数量")
+        for chunk in self.user_chunks():
+            model.update(chunk)
+        try:
+            model.fit()
+        except ValueError as error:
+            self.console.print(error, style=ERROR)
+            return
+        model.residuals(self.user_chunks())
+        self.console.print(model.summary(), style=INFO)
+        df = model.sample_frame()  # 按块读取时抽取的样本
+        x_v, y_v = df['粉丝数量'], df['获赞数量']
+        x_pred = np.linspace(x_v.min(), x_v.max(), 2)
+        y_pred = x_pred * model.coef[0] + model.intercept
+        self.render.scatter(x_v,
+                            y_v,
+                            label="用户数据",
+                            s=self.point_sz)
+        plt.plot(x_pred, y_pred, 'r--', label=f"权重参数={model.coef[0]}\n偏置参数={model.intercept}\nR²={model.r2:.4f}")
         plt.xlabel("粉丝数量")
         plt.ylabel("获赞数量")
         plt.title("粉丝数量与获赞数量的线性回归")
         plt.legend()
-        plt.show()
+        self.render.save("粉丝数量与获赞数量的线性回归")
 
     def vdata_vis(self) -> None:
-        vdata_df = pd.read_excel(self.vpath)
-        x = self.convert_time(vdata_df['视频时长'])
+        vdata_df = add_time_features(loader.load(self.vpath, copy=False))
+        x = vdata_df["视频时长秒"]
         # 时长与点赞数的关系
         y = vdata_df['点赞数量']
-        plt.scatter(x, y, s=self.point_sz)
+        self.render.scatter(x, y, s=self.point_sz)
         plt.xlabel("视频时长（s）")
         plt.ylabel("视频点赞数")
         plt.title("视频时长与视频点赞数的关系")
-        plt.show()
+        self.render.save("视频时长与视频点赞数的关系")
         # 时长与评论数的关系
         y = vdata_df['评论数量']
-        plt.scatter(x, y, s=self.point_sz)
+        self.render.scatter(x, y, s=self.point_sz)
         plt.xlabel("视频时长（s）")
         plt.ylabel("视频评论数")
         plt.title("视频时长与视频评论数的关系")
-        plt.show()
+        self.render.save("视频时长与视频评论数的关系")
+        self.vdata_time_vis(vdata_df)
 
-    def convert_time(self, times) -> list:
-        res = [times[i].split(':') for i in range(len(times))]
-        for i in range(len(res)):
-            res[i] = int(res[i][0]) * 3600 + int(res[i][1]) * 60 + int(res[i][2])
-        return res
\ No newline at end of file
+    def vdata_time_vis(self, vdata_df) -> None:
+        # 发布时段与平均点赞数的关系
+        likes = pd.to_numeric(vdata_df['点赞数量'], errors="coerce")
+        hour = likes.groupby(vdata_df["发布小时"]).mean().reindex(range(24), fill_value=0)
+        plt.bar(hour.index, hour.values)
+        plt.xlabel("发布时间（时）")
+        plt.ylabel("平均点赞数")
+        plt.title("发布时段与视频平均点赞数的关系")
+        self.render.save("发布时段与视频平均点赞数的关系")
+        week = likes.groupby(vdata_df["发布星期"]).mean().reindex(range(7), fill_value=0)
+        plt.bar(WEEKDAYS, week.values)
+        plt.xlabel("发布星期")
+        plt.ylabel("平均点赞数")
+        plt.title("发布星期与视频平均点赞数的关系")
+        self.render.save("发布星期与视频平均点赞数的关系")
@@ -1,22 +1,37 @@
 """处理非法字符串"""
 
+from functools import lru_cache
 from platform import system
 from string import whitespace
 from time import time
 
+from emoji import EMOJI_DATA
 from emoji import replace_emoji
 
 from src.customizer import illegal_nickname
 
 __all__ = ['Cleaner']
 
+# 所有 Emoji 序列中出现的非 ASCII 字符，不包含其中任何字符的字符串一定不含 Emoji
+EMOJI_CHARS = frozenset(c for e in EMOJI_DATA for c in e if not c.isascii())
+
 
 class Cleaner:
+    NAME_CACHE_SIZE = 4096  # 昵称清洗结果缓存数量
+
     def __init__(self):
         """
         替换字符串中包含的非法字符，默认根据系统类型生成对应的非法字符字典，也可以自行设置非法字符字典
         """
         self.rule = self.default_rule()  # 默认非法字符字典
+        self.table = str.maketrans(self.rule)  # 预先生成的转换表
+        self.clean_name = lru_cache(self.NAME_CACHE_SIZE)(self._clean_name)
+
+    def set_rule(self, rule: dict):
+        """设置非法字符字典，同时重建转换表并清空昵称缓存"""
+        self.rule = rule
+        self.table = str.maketrans(rule)
+        self.clean_name.cache_clear()
 
     @staticmethod
     def default_rule():
@@ -52,9 +67,17 @@ class Cleaner:
         :param text: 待处理的字符串
         :return: 替换后的字符串，如果替换后字符串为空，则返回 None
         """
-        for i in self.rule:
-            text = text.replace(i, self.rule[i])
-        return text
+        return text.translate(self.table)
+
+    @staticmethod
+    def has_emoji(text: str) -> bool:
+        return not text.isascii() and not EMOJI_CHARS.isdisjoint(text)
+
+    def _clean_name(self, text: str) -> str:
+        text = self.filter(text)
+        if self.has_emoji(text):
+            text = replace_emoji(text)
+        return text.strip().strip(".")
 
     def filter_name(
             self,
@@ -62,12 +85,7 @@ class Cleaner:
             inquire=True,
             default: str = "") -> str:
         """过滤文件夹名称中的非法字符"""
-        text = self.filter(text)
-
-        text = replace_emoji(text)
-
-        text = text.strip().strip(".")
-
+        text = self.clean_name(text)
         return (text or illegal_nickname() or default or str(
             time())[:10]) if inquire else (text or default)
 
@@ -0,0 +1,66 @@
+"""时间特征：视频时长与发布时间的向量化转换"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "parse_duration",
+    "duration_seconds",
+    "publish_time",
+    "add_time_features",
+    "FEATURES",
+    "WEEKDAYS",
+]
+
+FEATURES = ("视频时长秒", "发布小时", "发布星期")  # 派生特征列名
+WEEKDAYS = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+
+def parse_duration(times: pd.Series) -> pd.Series:
+    """将 HH:MM:SS 格式的时长转换为秒数，无法解析的数据为 NaN"""
+    parts = times.astype(str).str.extract(r"^\s*(\d+):(\d{1,2}):(\d{1,2})\s*$")
+    parts = parts.apply(pd.to_numeric, errors="coerce")
+    return parts[0] * 3600 + parts[1] * 60 + parts[2]
+
+
+def duration_seconds(frame: pd.DataFrame) -> pd.Series:
+    """优先使用毫秒时长列，旧版本数据缺少该列时解析 HH:MM:SS 字符串"""
+    seconds = pd.Series(np.nan, index=frame.index)
+    if "视频时长毫秒" in frame.columns:
+        seconds = pd.to_numeric(frame["视频时长毫秒"], errors="coerce") / 1000
+    if "视频时长" in frame.columns:
+        seconds = seconds.fillna(parse_duration(frame["视频时长"]))
+    return seconds
+
+
+def publish_time(frame: pd.DataFrame, date_format: str = None) -> pd.Series:
+    """
+    返回本地时区的发布时间，不带时区信息；优先使用发布时间戳，
+    与提取器使用 localtime 格式化的发布时间保持一致
+
+    :param date_format: 提取器格式化发布时间使用的格式，缺少时间戳时优先按该格式解析
+    """
+    result = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns]")
+    if "发布时间戳" in frame.columns:
+        stamp = pd.to_numeric(frame["发布时间戳"], errors="coerce")
+        result = (pd.to_datetime(stamp, unit="s", utc=True)
+                  .dt.tz_convert(datetime.now().astimezone().tzinfo)
+                  .dt.tz_localize(None))
+    if "发布时间" in frame.columns:
+        text = frame["发布时间"].astype(str)
+        if date_format:
+            result = result.fillna(pd.to_datetime(text, format=date_format, errors="coerce"))
+        result = result.fillna(pd.to_datetime(text, errors="coerce", format="mixed"))
+    return result
+
+
+def add_time_features(frame: pd.DataFrame) -> pd.DataFrame:
+    """返回添加派生时间特征的新数据表，不修改原数据表"""
+    time_ = publish_time(frame)
+    return frame.assign(**dict(zip(FEATURES, (
+        duration_seconds(frame),
+        time_.dt.hour,
+        time_.dt.weekday,
+    ))))
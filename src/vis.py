@@ -3,14 +3,24 @@
 from matplotlib import pyplot as plt
 import matplotlib.image as mpimg
 import pandas as pd
+from pathlib import Path
+
+from src.rendering import Renderer
 
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 
 
 class vis:
-    def __init__(self):
-        return
+    def __init__(self, root: Path = Path(__file__).resolve().parent.parent):
+        self.root = root  # 项目根目录
+        self.renderer = None  # 首次绘图时创建，导入模块时不切换绘图后端
+
+    @property
+    def render(self) -> Renderer:
+        if not self.renderer:
+            self.renderer = Renderer(self.root.joinpath("data"))  # 图表保存到 data/Charts
+        return self.renderer
 
     def run(self):
         self.histogram()
@@ -20,8 +30,7 @@ class vis:
         self.cal_score_all()
         self.word_cloud()
 
-    @staticmethod
-    def histogram():
+    def histogram(self):
         # 数据
         categories = ['0-100', '100-500', '500-1000', '1000-2500', '2500-5000', '5000-10000', '10000以上']
         values = [25, 190, 602, 1541, 1227, 847, 593]
@@ -35,16 +44,15 @@ class vis:
         plt.ylabel('点赞数')
 
         # 显示图形
-        plt.show()
+        self.render.save("游戏区点赞数分布情况")
 
-    @staticmethod
-    def pie_chart():
+    def pie_chart(self):
         filenames = ['2023-12-19 12.04.52_视频搜索_瓦洛兰特_综合排序_不限.xlsx',
                      '2023-12-19 14.28.48_视频搜索_英雄联盟_综合排序_不限.xlsx',
                      '2023-12-19 14.45.21_视频搜索_王者荣耀_综合排序_不限.xlsx']
         gamenames = ['瓦洛兰特', '英雄联盟', '王者荣誉']
         for i in range(3):
-            ori_df = pd.read_excel(f"data/{filenames[i]}")
+            ori_df = pd.read_excel(self.root.joinpath("data", filenames[i]))
             video_counts = ori_df['视频类型'].value_counts()
             labels = ['精彩高燃解说类', '技巧妙招策略类', '搞笑奇怪逗乐类', '热点桥段模仿类', '愉悦特效混剪类',
                       '周边资讯盘点类']
@@ -56,10 +64,9 @@ class vis:
             plt.legend(labels, loc='best')
             plt.title(f'{gamenames[i]}--视频类型分布')
             plt.axis('equal')
-            plt.show()
+            self.render.save(f"{gamenames[i]}--视频类型分布")
 
-    @staticmethod
-    def cal_score_1():
+    def cal_score_1(self):
         # 数据
         categories = ['精彩解说高燃类', '技巧妙招策略类', '搞笑奇怪逗乐类', '热点桥段模仿类', '愉悦特效混剪类',
                       '周边咨询判盘点类']
@@ -80,10 +87,9 @@ class vis:
         plt.ylabel('指数')
 
         # 显示图形
-        plt.show()
+        self.render.save("Moba类综合互动指数")
 
-    @staticmethod
-    def cal_score_2():
+    def cal_score_2(self):
         # 数据
         categories = ['精彩解说高燃类', '技巧妙招策略类', '搞笑奇怪逗乐类', '热点桥段模仿类', '愉悦特效混剪类',
                       '周边咨询判盘点类']
@@ -104,10 +110,9 @@ class vis:
         plt.ylabel('指数')
 
         # 显示图形
-        plt.show()
+        self.render.save("FPS类综合互动指数")
 
-    @staticmethod
-    def cal_score_all():
+    def cal_score_all(self):
         # 数据
         categories = ['精彩解说高燃类', '技巧妙招策略类', '搞笑奇怪逗乐类', '热点桥段模仿类', '愉悦特效混剪类',
                       '周边咨询判盘点类']
@@ -128,16 +133,15 @@ class vis:
         plt.ylabel('指数')
 
         # 显示图形
-        plt.show()
+        self.render.save("所有游戏类型综合互动指数")
 
-    @staticmethod
-    def word_cloud():
-        image_path = 'other/word_cloud.png'
+    def word_cloud(self):
+        image_path = self.root.joinpath('other/word_cloud.png')
         img = mpimg.imread(image_path)
         plt.imshow(img)
         plt.axis('off')
-        plt.show()
+        self.render.save("词云")
 
 
 if __name__ == '__main__':
-    vis.word_cloud()
+    vis().word_cloud()
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from unittest import main
+
+import numpy as np
+import pandas as pd
+
+from src.correlation import PairwiseCorrelation
+
+
+class PairwiseCorrelationTest(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        size = 3000
+        self.df = pd.DataFrame({
+            "a": rng.normal(1e6, 5, size),
+            "b": rng.normal(0, 1, size),
+            "c": rng.normal(3, 2, size),
+        })
+        self.df["b"] += self.df["a"] * 0.1
+        self.df["c"] += self.df["b"]
+        # 稀疏列：按行删除时几乎没有完整数据行
+        self.df.loc[rng.random(size) < 0.9, "c"] = np.nan
+        self.df.loc[rng.random(size) < 0.2, "a"] = np.nan
+
+    def test_chunks_match_pandas_pairwise(self):
+        running = PairwiseCorrelation(self.df.columns)
+        for i in range(0, len(self.df), 701):
+            running.update(self.df.iloc[i:i + 701])
+        np.testing.assert_allclose(
+            running.correlation().to_numpy(), self.df.corr().to_numpy(), atol=1e-9)
+
+    def test_merge_matches_single_pass(self):
+        left = PairwiseCorrelation(self.df.columns).update(self.df.iloc[:100])
+        right = PairwiseCorrelation(self.df.columns).update(self.df.iloc[100:])
+        np.testing.assert_allclose(
+            left.merge(right).correlation().to_numpy(), self.df.corr().to_numpy(), atol=1e-9)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest import main
+
+from src.datastore import DataStore
+from src.records import SearchUserRecord
+
+
+def user_row(sec_uid: str, follower_count, total_favorited) -> list:
+    values = dict.fromkeys(SearchUserRecord.columns, "")
+    values.update(
+        sec_uid=sec_uid,
+        follower_count=follower_count,
+        total_favorited=total_favorited)
+    return [values[i] for i in SearchUserRecord.columns]
+
+
+class DataStoreIntegerTest(TestCase):
+    def setUp(self):
+        self.folder = TemporaryDirectory()
+        self.store = DataStore(Path(self.folder.name))
+        self.store.open()
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_zero_count_is_not_greater_than_threshold(self):
+        # 提取器将数量为 0 的字段记为空字符串
+        self.store.upsert_many("search_user", [
+            user_row("zero", "", ""),
+            user_row("small", 10, 5),
+            user_row("large", 20000, 300),
+        ])
+        rows = self.store.query(
+            "authors", ("sec_uid",), {"follower_count": (">", 10000)})
+        self.assertEqual(rows, [("large",)])
+        self.assertEqual(self.store.count("authors", {"follower_count": (">", 10000)}), 1)
+
+    def test_integer_columns_are_stored_as_integers(self):
+        self.store.upsert_many("search_user", [
+            user_row("zero", "", "abc"),
+            user_row("text", "42", 7.0),
+        ])
+        rows = dict(self.store.db.execute(
+            "SELECT sec_uid, typeof(follower_count) || ',' || typeof(total_favorited) FROM authors;"))
+        self.assertEqual(rows, {"zero": "null,null", "text": "integer,integer"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from unittest import TestCase
+from unittest import main
+
+from src.stringcleaner import Cleaner
+
+
+class CleanerRuleTest(TestCase):
+    def test_set_rule_clears_name_cache(self):
+        cleaner = Cleaner()
+        cleaner.set_rule({"/": ""})
+        self.assertEqual(cleaner.filter_name("a/b#c", False), "ab#c")
+        cleaner.set_rule({"/": "", "#": "_"})
+        self.assertEqual(cleaner.filter_name("a/b#c", False), "ab_c")
+        self.assertEqual(cleaner.clean_name.cache_info().currsize, 1)
+
+
+if __name__ == "__main__":
+    main()